@@ -0,0 +1,288 @@
+"""
+Benchmark: comparación A/B intercalada entre dos stacks o builds.
+
+Cada stack se define con `A_*` / `B_*` (`CORE_BASE_URL`, `ADAPTER_BASE_URL`,
+`<CANAL>_ADAPTER_BASE_URL`, `FAKE_OSM_BASE_URL`). La carga se divide en
+rondas; en cada ronda se genera un bloque de sesiones texto + ubicación y se
+envía idéntico a los dos stacks, en orden aleatorio. Así la deriva de la
+máquina (temperatura, otros procesos, caches) afecta por igual a ambos. El
+reporte compara percentiles de latencia y throughput con intervalos bootstrap
+por rondas, y la distribución completa de cada latencia con la prueba de
+Mann-Whitney.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools import arrivals  # noqa: E402
+from tools.correlation import NoteWatcher, new_token  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.load import Arrival, SessionResult, merge_streams, run_open_loop  # noqa: E402
+from tools.metrics import Comparison, compare_samples, format_ms, mann_whitney, percentile  # noqa: E402
+from tools.payload_corpus import JSON_HEADERS, PayloadCorpus  # noqa: E402
+from tools.payloads import CHANNELS  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+CHANNEL = os.environ.get("AB_CHANNEL", "telegram")
+ROUNDS = int(os.environ.get("AB_ROUNDS", "10"))
+RATE = float(os.environ.get("AB_RATE", "5"))
+BLOCK_SECONDS = float(os.environ.get("AB_BLOCK_SECONDS", "10"))
+WORKERS = int(os.environ.get("AB_WORKERS", "32"))
+SEED = int(os.environ.get("AB_SEED", "1"))
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("AB_DRAIN_TIMEOUT", "30"))
+# Pausa entre bloques para que las colas del stack anterior se vacíen.
+PAUSE_SECONDS = float(os.environ.get("AB_PAUSE_SECONDS", "1"))
+BOOTSTRAP_ITERATIONS = int(os.environ.get("AB_BOOTSTRAP_ITERATIONS", "2000"))
+CONFIDENCE = float(os.environ.get("AB_CONFIDENCE", "0.95"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+
+@dataclass
+class Stack:
+    label: str
+    core_url: str
+    adapter_url: str
+    fake_osm_url: str
+    # Una lista de resultados y un throughput por ronda: el bootstrap remuestrea rondas.
+    rounds: list[list[SessionResult]] = field(default_factory=list)
+    throughput: list[float] = field(default_factory=list)
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "Stack":
+        def url(name: str, *fallbacks: str) -> str:
+            for var in (name, *fallbacks):
+                value = os.environ.get(prefix + var)
+                if value:
+                    return value
+            raise SystemExit(f"Falta {prefix}{name} para el stack {prefix.rstrip('_')}")
+
+        return cls(
+            label=os.environ.get(f"{prefix}LABEL", prefix.rstrip("_")),
+            core_url=url("CORE_BASE_URL"),
+            adapter_url=url(f"{CHANNEL.upper()}_ADAPTER_BASE_URL", "ADAPTER_BASE_URL"),
+            fake_osm_url=url("FAKE_OSM_BASE_URL"),
+        )
+
+    @property
+    def results(self) -> list[SessionResult]:
+        return [result for results in self.rounds for result in results]
+
+    def blocks(self, metric: str) -> list[list[float]]:
+        """Muestras de `metric` agrupadas por ronda."""
+        if metric == "throughput":
+            return [[value] for value in self.throughput]
+        blocks = []
+        for results in self.rounds:
+            values = (r.ack_latency if metric == "ack" else r.e2e_latency for r in results if not r.error)
+            blocks.append([value for value in values if value is not None])
+        return blocks
+
+    def samples(self, metric: str) -> list[float]:
+        return [value for block in self.blocks(metric) for value in block]
+
+
+def _run_block(stack: Stack, block: list[Arrival], user_base: int) -> None:
+    """Envía el bloque al stack y espera sus notas antes de devolver."""
+    channel = CHANNELS[CHANNEL]
+    corpus = PayloadCorpus(channel)
+    adapter = get_client(stack.adapter_url)
+    fake_osm = get_client(stack.fake_osm_url)
+    watcher = NoteWatcher(fake_osm).start()
+
+    def session(arrival: Arrival, scheduled_at: float) -> SessionResult:
+        token = new_token()
+        result = SessionResult(stream=stack.label, token=token, scheduled_at=scheduled_at)
+        user_index = user_base + arrival.seq
+        try:
+            for body in (
+                corpus.text(user_index, token, 2 * user_index),
+                corpus.location(user_index, TEST_LATITUDE, TEST_LONGITUDE, 2 * user_index + 1),
+            ):
+                adapter.post(channel.webhook_path, content=body, headers=JSON_HEADERS).raise_for_status()
+        except Exception as exc:  # noqa: BLE001 - se reporta como error de la sesión
+            result.error = f"{type(exc).__name__}: {exc}"
+        result.ack_latency = time.perf_counter() - scheduled_at
+        return result
+
+    try:
+        results, start = run_open_loop(block, session, max_workers=WORKERS)
+        watcher.wait_for({r.token for r in results if not r.error}, DRAIN_TIMEOUT_SECONDS)
+    finally:
+        watcher.stop()
+        fake_osm.close()
+        adapter.close()
+
+    for result in results:
+        result.note_seen_at = watcher.seen_at.get(result.token)
+    seen = [r.note_seen_at for r in results if r.note_seen_at is not None]
+    # Una ronda sin notas cuenta como throughput cero para no desalinear las rondas de A y B.
+    stack.throughput.append(len(seen) / max(max(seen) - start, BLOCK_SECONDS) if seen else 0.0)
+    stack.rounds.append(results)
+
+
+def _row(metric: str, unit: str, comparison: Comparison, scale: float, lower_is_better: bool) -> list[object]:
+    def fmt(value: float) -> str:
+        return "-" if math.isnan(value) else f"{value * scale:.1f}"
+
+    if math.isnan(comparison.delta) or not comparison.significant:
+        verdict = "sin diferencia"
+    elif (comparison.delta < 0) == lower_is_better:
+        verdict = "B mejor"
+    else:
+        verdict = "B peor"
+    return [
+        f"{metric} ({unit})",
+        fmt(comparison.a),
+        fmt(comparison.b),
+        fmt(comparison.delta),
+        "-" if math.isnan(comparison.relative) else f"{comparison.relative * 100:+.1f} %",
+        f"[{fmt(comparison.low)}, {fmt(comparison.high)}]",
+        verdict,
+    ]
+
+
+def _distribution_row(metric: str, a: list[float], b: list[float]) -> list[object]:
+    """Mann-Whitney sobre la distribución completa: ¿tiende B a tardar más o menos que A?"""
+    u_b, p_value = mann_whitney(a, b)
+    if math.isnan(p_value) or p_value >= 1 - CONFIDENCE:
+        verdict = "sin diferencia"
+    else:
+        # U de B por encima de la mitad: B suele tener latencias mayores.
+        verdict = "B peor" if u_b > len(a) * len(b) / 2 else "B mejor"
+    return [
+        metric,
+        len(a),
+        len(b),
+        "-" if math.isnan(u_b) else f"{u_b:.0f}",
+        "-" if math.isnan(p_value) else f"{p_value:.3g}",
+        verdict,
+    ]
+
+
+def main() -> None:
+    stacks = [Stack.from_env("A_"), Stack.from_env("B_")]
+    if stacks[0].label == stacks[1].label:
+        stacks[1].label += " (B)"
+    rng = random.Random(SEED)
+    orders = []
+
+    print(
+        f"{ROUNDS} rondas de {BLOCK_SECONDS:.0f} s a {RATE:g} sesiones/s por stack: "
+        f"{stacks[0].label} vs {stacks[1].label} ({CHANNEL})"
+    )
+    for round_index in range(ROUNDS):
+        # El mismo bloque (instantes de llegada y usuarios) para los dos stacks.
+        times = arrivals.poisson(RATE, BLOCK_SECONDS, random.Random(rng.random())).times
+        block = merge_streams({CHANNEL: times})
+        user_base = int(time.time()) % 100000 * 1000
+        order = rng.sample(stacks, k=len(stacks))
+        orders.append("".join("A" if stack is stacks[0] else "B" for stack in order))
+        for stack in order:
+            _run_block(stack, block, user_base)
+            time.sleep(PAUSE_SECONDS)
+        print(f"ronda {round_index + 1}/{ROUNDS} ({orders[-1]}): {len(block)} sesiones por stack")
+
+    a, b = stacks
+    compare_rng = random.Random(SEED)
+    rows = []
+    for metric, key, statistic_name, q in (
+        ("ACK p50", "ack", "p50", 50),
+        ("ACK p95", "ack", "p95", 95),
+        ("E2E p50", "e2e", "p50", 50),
+        ("E2E p95", "e2e", "p95", 95),
+        ("E2E p99", "e2e", "p99", 99),
+    ):
+        comparison = compare_samples(
+            a.blocks(key),
+            b.blocks(key),
+            lambda samples, q=q: percentile(samples, q),
+            compare_rng,
+            BOOTSTRAP_ITERATIONS,
+            CONFIDENCE,
+        )
+        rows.append(_row(metric, "ms", comparison, 1000, lower_is_better=True))
+    throughput = compare_samples(
+        a.blocks("throughput"),
+        b.blocks("throughput"),
+        lambda samples: percentile(samples, 50),
+        compare_rng,
+        BOOTSTRAP_ITERATIONS,
+        CONFIDENCE,
+    )
+    rows.append(_row("Throughput mediano por bloque", "notas/s", throughput, 1, lower_is_better=False))
+    for row in rows:
+        print(f"{row[0]:36} A={row[1]:>8} B={row[2]:>8} Δ={row[3]:>8} IC={row[5]} → {row[6]}")
+    distribution_rows = [
+        _distribution_row("Latencia ACK", a.samples("ack"), b.samples("ack")),
+        _distribution_row("Latencia E2E", a.samples("e2e"), b.samples("e2e")),
+    ]
+    for row in distribution_rows:
+        print(f"{row[0]:36} Mann-Whitney U={row[3]} p={row[4]} → {row[5]}")
+
+    stack_rows = []
+    for stack in stacks:
+        sent = len(stack.results)
+        errors = sum(1 for r in stack.results if r.error)
+        notes = sum(1 for r in stack.results if r.note_seen_at is not None)
+        stack_rows.append(
+            [
+                stack.label,
+                stack.adapter_url,
+                stack.core_url,
+                stack.fake_osm_url,
+                sent,
+                errors,
+                sent - errors - notes,
+            ]
+        )
+
+    report_path = build_table_report(
+        f"Comparación A/B: {a.label} vs {b.label} ({RELEASE_LABEL})",
+        ["Métrica", "A", "B", "Δ (B − A)", "Δ %", f"IC {CONFIDENCE:.0%}", "Veredicto"],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"ab_compare_{RELEASE_LABEL}",
+        notes=[
+            f"Canal {CHANNEL}; {ROUNDS} rondas de {BLOCK_SECONDS:.0f} s con llegadas Poisson a {RATE:g} sesiones/s, "
+            f"bloque idéntico para ambos stacks; semilla {SEED}",
+            "Orden por ronda: " + " ".join(orders),
+            f"IC bootstrap percentil por rondas ({BOOTSTRAP_ITERATIONS} remuestreos de rondas completas, "
+            "las mismas para A y B); veredicto solo cuando el intervalo excluye el cero",
+            "Mann-Whitney: una prueba por distribución (todas las sesiones), no por percentil; "
+            f"diferencia cuando p < {1 - CONFIDENCE:.2g}",
+            "Throughput por bloque: notas recibidas / tiempo hasta la última nota (mínimo la duración del bloque)",
+        ],
+        extra_tables=[
+            (
+                "Distribución completa (Mann-Whitney)",
+                ["Métrica", "Sesiones A", "Sesiones B", "U de B", "p", "Veredicto"],
+                distribution_rows,
+            ),
+            (
+                "Stacks",
+                ["Stack", "Adaptador", "Core", "Fake OSM", "Sesiones", "Errores", "Notas perdidas"],
+                stack_rows,
+            ),
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
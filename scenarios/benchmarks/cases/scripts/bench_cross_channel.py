@@ -0,0 +1,184 @@
+"""
+Benchmark: contención entre canales sobre un único core.
+
+Genera sesiones texto + ubicación por WhatsApp y Telegram a la vez, a tasas
+configurables, contra adaptadores que comparten el mismo `terranote-core` y
+el mismo fake OSM. Reporta throughput y latencias de cola por canal y en
+total para detectar contención de locks o planificación injusta en el core.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.correlation import NoteWatcher, new_token  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.load import (  # noqa: E402
+    Arrival,
+    SessionResult,
+    StreamSummary,
+    constant_rate,
+    merge_streams,
+    run_open_loop,
+    summarize_stream,
+)
+from tools.metrics import format_ms  # noqa: E402
+from tools.payload_corpus import JSON_HEADERS, PayloadCorpus  # noqa: E402
+from tools.payloads import CHANNELS  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+CORE_BASE_URL = os.environ.get("CORE_BASE_URL", "http://localhost:8000")
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+RATES = {
+    "telegram": float(os.environ.get("CONTENTION_TELEGRAM_RATE", "2")),
+    "whatsapp": float(os.environ.get("CONTENTION_WHATSAPP_RATE", "2")),
+}
+ADAPTER_CHANNELS = list(RATES)
+DURATION_SECONDS = float(os.environ.get("CONTENTION_DURATION", "30"))
+WORKERS = int(os.environ.get("CONTENTION_WORKERS", "32"))
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("CONTENTION_DRAIN_TIMEOUT", "30"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+
+def main() -> None:
+    streams = {name: constant_rate(rate, DURATION_SECONDS) for name, rate in RATES.items() if rate > 0}
+    arrivals = merge_streams(streams)
+    user_base = int(time.time()) % 100000 * 1000
+    user_lock = threading.Lock()
+    next_user = iter(range(user_base, user_base + len(arrivals)))
+
+    adapters = {name: get_client(CHANNELS[name].adapter_url) for name in streams}
+    # Cuerpos pre-serializados: el generador no reconstruye ni serializa cada webhook.
+    corpora = {name: PayloadCorpus(CHANNELS[name]) for name in streams}
+    fake_osm = get_client(FAKE_OSM_BASE_URL)
+    watcher = NoteWatcher(fake_osm).start()
+
+    def session(arrival: Arrival, scheduled_at: float) -> SessionResult:
+        channel = CHANNELS[arrival.stream]
+        with user_lock:
+            user_index = next(next_user)
+        token = new_token()
+        result = SessionResult(stream=channel.name, token=token, scheduled_at=scheduled_at)
+        adapter = adapters[channel.name]
+        corpus = corpora[channel.name]
+        try:
+            adapter.post(
+                channel.webhook_path,
+                content=corpus.text(user_index, token, 2 * user_index, f"Vía cerrada ({channel.name})"),
+                headers=JSON_HEADERS,
+            ).raise_for_status()
+            adapter.post(
+                channel.webhook_path,
+                content=corpus.location(user_index, TEST_LATITUDE, TEST_LONGITUDE, 2 * user_index + 1),
+                headers=JSON_HEADERS,
+            ).raise_for_status()
+        except Exception as exc:  # noqa: BLE001 - se reporta como error del canal
+            result.error = f"{type(exc).__name__}: {exc}"
+        result.ack_latency = time.perf_counter() - scheduled_at
+        return result
+
+    print(
+        f"Generando {len(arrivals)} sesiones en {DURATION_SECONDS:.0f} s "
+        + ", ".join(f"{name}={rate}/s" for name, rate in RATES.items())
+    )
+    try:
+        results, start = run_open_loop(arrivals, session, max_workers=WORKERS)
+        expected = {r.token for r in results if not r.error}
+        print(f"Esperando hasta {DRAIN_TIMEOUT_SECONDS:.0f} s por {len(expected)} notas...")
+        watcher.wait_for(expected, DRAIN_TIMEOUT_SECONDS)
+    finally:
+        watcher.stop()
+        fake_osm.close()
+        for client in adapters.values():
+            client.close()
+
+    for result in results:
+        result.note_seen_at = watcher.seen_at.get(result.token)
+
+    summaries: list[StreamSummary] = [
+        summarize_stream(name, [r for r in results if r.stream == name], start) for name in streams
+    ]
+    summaries.append(summarize_stream("total", results, start))
+
+    rows = []
+    for summary in summaries:
+        rate = sum(RATES.values()) if summary.stream == "total" else RATES[summary.stream]
+        print(
+            f"{summary.stream:9} enviadas={summary.sent} notas={summary.notes} errores={summary.errors} "
+            f"perdidas={summary.lost} {summary.throughput:.2f} notas/s e2e p99={format_ms(summary.e2e.p99)} ms"
+        )
+        rows.append(
+            [
+                summary.stream,
+                f"{rate:g}",
+                summary.sent,
+                summary.errors,
+                summary.lost,
+                f"{summary.throughput:.2f}",
+                format_ms(summary.ack.p50),
+                format_ms(summary.ack.p99),
+                format_ms(summary.e2e.p50),
+                format_ms(summary.e2e.p95),
+                format_ms(summary.e2e.p99),
+                format_ms(summary.e2e.maximum),
+            ]
+        )
+
+    channel_p95 = [s.e2e.p95 for s in summaries if s.stream != "total" and s.notes]
+    # El harness no ve a qué core apunta cada adaptador; lo que sí comprueba es que
+    # las notas de cada canal llegan al mismo fake OSM.
+    unshared = [s.stream for s in summaries if s.stream != "total" and s.sent > s.errors and not s.notes]
+    notes = [
+        f"Core compartido: {CORE_BASE_URL}; fake OSM: {FAKE_OSM_BASE_URL}",
+        "Se asume que los adaptadores usan ese core; solo se verifica que las notas de cada canal llegan a ese fake OSM",
+        f"Duración {DURATION_SECONDS:.0f} s, {WORKERS} hilos, llegadas a tasa constante por canal",
+        "Latencias medidas desde el instante programado de cada sesión (ACK = texto + ubicación)",
+    ]
+    if len(channel_p95) > 1:
+        notes.append(f"Relación p95 E2E entre canales (máx/mín): {max(channel_p95) / min(channel_p95):.2f}")
+
+    report_path = build_table_report(
+        f"Contención entre canales ({RELEASE_LABEL})",
+        [
+            "Canal",
+            "Tasa (ses/s)",
+            "Sesiones",
+            "Errores",
+            "Notas perdidas",
+            "Throughput (notas/s)",
+            "ACK p50 (ms)",
+            "ACK p99 (ms)",
+            "E2E p50 (ms)",
+            "E2E p95 (ms)",
+            "E2E p99 (ms)",
+            "E2E máx (ms)",
+        ],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"cross_channel_{RELEASE_LABEL}",
+        notes=notes,
+    )
+    print(f"📝 Reporte: {report_path}")
+    if unshared:
+        raise AssertionError(
+            f"Ninguna nota de {', '.join(unshared)} llegó a {FAKE_OSM_BASE_URL}: "
+            "los adaptadores no comparten core y fake OSM"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark: latencia por salto con propagación de contexto de traza.
+
+Genera sesiones texto + ubicación en lazo abierto con un `traceparent` en cada
+webhook, recoge los spans que emiten los servicios (colector OTLP local y/o
+eventos de fake OSM), corrige el desfase de relojes entre servicios y
+descompone la latencia por salto (adaptador → core → OSM → callback)
+agregada sobre toda la carga.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.correlation import NoteWatcher, new_token  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.load import Arrival, SessionResult, constant_rate, merge_streams, run_open_loop, summarize_stream  # noqa: E402
+from tools.metrics import LatencySummary, format_ms  # noqa: E402
+from tools.payload_corpus import JSON_HEADERS, PayloadCorpus  # noqa: E402
+from tools.payloads import CHANNELS  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+from tools.tracing import (  # noqa: E402
+    Span,
+    SpanCollector,
+    correct_clock_skew,
+    group_traces,
+    hop_breakdown,
+    spans_from_events,
+    traced_post,
+)
+
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+CHANNEL = os.environ.get("TRACE_CHANNEL", "telegram")
+ADAPTER_CHANNELS = [CHANNEL]
+RATE = float(os.environ.get("TRACE_RATE", "2"))
+DURATION_SECONDS = float(os.environ.get("TRACE_DURATION", "30"))
+WORKERS = int(os.environ.get("TRACE_WORKERS", "16"))
+# Fuentes de spans: `otlp` (colector local), `events` (/__control__/events) o ambas.
+SPAN_SOURCES = os.environ.get("TRACE_SPAN_SOURCES", "otlp,events").split(",")
+COLLECTOR_HOST = os.environ.get("TRACE_COLLECTOR_HOST", "127.0.0.1")
+COLLECTOR_PORT = int(os.environ.get("TRACE_COLLECTOR_PORT", "4318"))
+# Margen para que los exportadores por lotes de los servicios envíen sus spans.
+FLUSH_SECONDS = float(os.environ.get("TRACE_FLUSH_SECONDS", "5"))
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("TRACE_DRAIN_TIMEOUT", "30"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+
+def _collect_spans(collector: SpanCollector | None) -> list[Span]:
+    spans = collector.snapshot() if collector else []
+    if "events" in SPAN_SOURCES:
+        with get_client(FAKE_OSM_BASE_URL) as client:
+            response = client.get("/__control__/events")
+            response.raise_for_status()
+            spans.extend(spans_from_events(response.json()))
+    return spans
+
+
+def main() -> None:
+    channel = CHANNELS[CHANNEL]
+    corpus = PayloadCorpus(channel)
+    arrivals = merge_streams({CHANNEL: constant_rate(RATE, DURATION_SECONDS)})
+    user_base = int(time.time()) % 100000 * 1000
+    root_spans: list[Span] = []
+    spans_lock = threading.Lock()
+
+    collector = SpanCollector(COLLECTOR_HOST, COLLECTOR_PORT).start() if "otlp" in SPAN_SOURCES else None
+    if collector:
+        print(f"Colector OTLP en {collector.base_url}/v1/traces")
+    adapter = get_client(channel.adapter_url)
+    fake_osm = get_client(FAKE_OSM_BASE_URL)
+    watcher = NoteWatcher(fake_osm).start()
+
+    def session(arrival: Arrival, scheduled_at: float) -> SessionResult:
+        token = new_token()
+        result = SessionResult(stream=channel.name, token=token, scheduled_at=scheduled_at)
+        user_index = user_base + arrival.seq
+        bodies = [
+            ("texto", corpus.text(user_index, token, 2 * arrival.seq)),
+            ("ubicación", corpus.location(user_index, TEST_LATITUDE, TEST_LONGITUDE, 2 * arrival.seq + 1)),
+        ]
+        try:
+            for name, body in bodies:
+                response, span = traced_post(
+                    adapter, channel.webhook_path, f"webhook {name}", content=body, headers=JSON_HEADERS
+                )
+                with spans_lock:
+                    root_spans.append(span)
+                response.raise_for_status()
+        except Exception as exc:  # noqa: BLE001 - se reporta como error de la sesión
+            result.error = f"{type(exc).__name__}: {exc}"
+        result.ack_latency = time.perf_counter() - scheduled_at
+        return result
+
+    print(f"Generando {len(arrivals)} sesiones de {channel.name} a {RATE:g}/s durante {DURATION_SECONDS:.0f} s")
+    try:
+        results, start = run_open_loop(arrivals, session, max_workers=WORKERS)
+        watcher.wait_for({r.token for r in results if not r.error}, DRAIN_TIMEOUT_SECONDS)
+        time.sleep(FLUSH_SECONDS)
+        spans = _collect_spans(collector)
+    finally:
+        watcher.stop()
+        fake_osm.close()
+        adapter.close()
+        if collector:
+            collector.stop()
+
+    for result in results:
+        result.note_seen_at = watcher.seen_at.get(result.token)
+    summary = summarize_stream(channel.name, results, start)
+
+    traces = group_traces([*root_spans, *spans], {span.trace_id for span in root_spans})
+    traced = {trace_id: trace for trace_id, trace in traces.items() if len(trace) > 1}
+    corrected, offsets = correct_clock_skew(traced)
+    hops = hop_breakdown(corrected)
+    total = LatencySummary.from_samples([span.duration for span in root_spans])
+
+    rows = [
+        [
+            "harness (ACK del webhook)",
+            len(root_spans),
+            format_ms(0.0),
+            "-",
+            format_ms(total.p50),
+            format_ms(total.p95),
+            format_ms(total.p99),
+            "-",
+            "-",
+            format_ms(0.0),
+        ]
+    ]
+    for hop in hops:
+        arrival = LatencySummary.from_samples(hop.arrival)
+        duration = LatencySummary.from_samples(hop.duration)
+        own = LatencySummary.from_samples(hop.self_time)
+        rows.append(
+            [
+                hop.service,
+                len(hop.duration),
+                format_ms(arrival.p50),
+                format_ms(arrival.p95),
+                format_ms(duration.p50),
+                format_ms(duration.p95),
+                format_ms(duration.p99),
+                format_ms(own.p50),
+                format_ms(own.p95),
+                format_ms(offsets.get(hop.service, 0.0)),
+            ]
+        )
+    for row in rows:
+        print(f"{row[0]:28} trazas={row[1]} inicio p50={row[2]} ms duración p50={row[4]} ms p99={row[6]} ms")
+
+    notes = [
+        f"Canal {channel.name}, {RATE:g} sesiones/s durante {DURATION_SECONDS:.0f} s, {WORKERS} hilos",
+        f"Sesiones: {summary.sent}, errores: {summary.errors}, notas perdidas: {summary.lost}, "
+        f"E2E p95: {format_ms(summary.e2e.p95)} ms",
+        f"Webhooks trazados: {len(root_spans)}; con spans de servicios: {len(traced)}; "
+        f"spans recogidos: {len(spans)} ({', '.join(SPAN_SOURCES)})",
+        "Inicio: desde el envío del webhook hasta el primer span del salto; "
+        "propio: duración sin los spans de otros servicios que cuelgan del salto",
+        "Corrección de reloj: desfase sumado a los spans de cada servicio para respetar los intervalos padre/hijo",
+    ]
+    if not traced:
+        notes.append("Ningún servicio emitió spans para estas trazas: revisar la exportación OTLP o los eventos")
+
+    report_path = build_table_report(
+        f"Latencia por salto ({RELEASE_LABEL})",
+        [
+            "Salto",
+            "Trazas",
+            "Inicio p50 (ms)",
+            "Inicio p95 (ms)",
+            "Duración p50 (ms)",
+            "Duración p95 (ms)",
+            "Duración p99 (ms)",
+            "Propio p50 (ms)",
+            "Propio p95 (ms)",
+            "Corrección de reloj (ms)",
+        ],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"hop_latency_{RELEASE_LABEL}",
+        notes=notes,
+    )
+    print(f"📝 Reporte: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark: densidad de notas vs. latencia de consultas por bbox.
+
+Siembra fake OSM con N notas distribuidas alrededor de TEST_LATITUDE /
+TEST_LONGITUDE siguiendo un patrón espacial (uniforme, focos urbanos o
+corredores viales) y mide latencia y tamaño de respuesta de
+`/api/0.6/notes.json?bbox=...` para distintos tamaños de bbox y cantidades de
+notas. El resultado es una curva de escalamiento por versión.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import time
+from pathlib import Path
+
+import httpx
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.http_client import get_client  # noqa: E402
+from tools.metrics import LatencySummary, format_ms  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+NOTE_COUNTS = [int(n) for n in os.environ.get("DENSITY_NOTE_COUNTS", "100,1000,5000").split(",")]
+BBOX_HALF_SIDES = [float(d) for d in os.environ.get("DENSITY_BBOX_DEGREES", "0.005,0.02,0.05,0.2").split(",")]
+PATTERN = os.environ.get("DENSITY_PATTERN", "clustered")
+SPREAD_DEGREES = float(os.environ.get("DENSITY_SPREAD_DEGREES", "0.15"))
+SAMPLES = int(os.environ.get("DENSITY_SAMPLES", "20"))
+QUERY_LIMIT = int(os.environ.get("DENSITY_QUERY_LIMIT", "10000"))
+SEED = int(os.environ.get("DENSITY_SEED", "42"))
+# Endpoint opcional de carga masiva; sin él se usa la API de creación de notas.
+BULK_SEED_PATH = os.environ.get("DENSITY_BULK_SEED_PATH", "")
+BULK_BATCH_SIZE = 500
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+Coordinates = tuple[list[float], list[float]]
+
+
+def _uniform(count: int, rng: random.Random) -> Coordinates:
+    lats = [TEST_LATITUDE + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) for _ in range(count)]
+    lons = [TEST_LONGITUDE + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) for _ in range(count)]
+    return lats, lons
+
+
+def _clustered(count: int, rng: random.Random, hotspots: int = 12) -> Coordinates:
+    """Focos urbanos con popularidad tipo Zipf y dispersión gaussiana alrededor de cada uno."""
+    centers = [
+        (rng.gauss(TEST_LATITUDE, SPREAD_DEGREES / 3), rng.gauss(TEST_LONGITUDE, SPREAD_DEGREES / 3))
+        for _ in range(hotspots)
+    ]
+    weights = [1 / (rank + 1) for rank in range(hotspots)]
+    chosen = rng.choices(centers, weights=weights, k=count)
+    sigma = SPREAD_DEGREES / 20
+    lats = [lat + rng.gauss(0, sigma) for lat, _ in chosen]
+    lons = [lon + rng.gauss(0, sigma) for _, lon in chosen]
+    return lats, lons
+
+
+def _corridor(count: int, rng: random.Random, roads: int = 6) -> Coordinates:
+    """Puntos a lo largo de segmentos que cruzan el área, como reportes sobre vías."""
+    segments = []
+    for _ in range(roads):
+        angle = rng.uniform(0, math.pi)
+        offset_lat = rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2
+        offset_lon = rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2
+        segments.append((TEST_LATITUDE + offset_lat, TEST_LONGITUDE + offset_lon, math.sin(angle), math.cos(angle)))
+    chosen = rng.choices(segments, k=count)
+    positions = [rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) for _ in range(count)]
+    noise = [rng.gauss(0, SPREAD_DEGREES / 200) for _ in range(count)]
+    lats = [lat + t * dlat + n for (lat, _, dlat, _), t, n in zip(chosen, positions, noise)]
+    lons = [lon + t * dlon - n for (_, lon, _, dlon), t, n in zip(chosen, positions, noise)]
+    return lats, lons
+
+
+PATTERNS = {"uniform": _uniform, "clustered": _clustered, "corridor": _corridor}
+
+
+def generate_coordinates(count: int, rng: random.Random) -> Coordinates:
+    """Genera el lote completo de coordenadas de una sola vez (columnas lat/lon)."""
+    if PATTERN not in PATTERNS:
+        raise ValueError(f"Patrón desconocido '{PATTERN}', opciones: {', '.join(PATTERNS)}")
+    return PATTERNS[PATTERN](count, rng)
+
+
+def _bbox(half_side: float) -> str:
+    return ",".join(
+        f"{value:.6f}"
+        for value in (
+            TEST_LONGITUDE - half_side,
+            TEST_LATITUDE - half_side,
+            TEST_LONGITUDE + half_side,
+            TEST_LATITUDE + half_side,
+        )
+    )
+
+
+def _count_notes(client: httpx.Client) -> int:
+    """Notas ya presentes en el área que cubren los patrones (±2 veces la dispersión).
+
+    La API de notas no pagina: si la respuesta llega al límite, el conteo no es fiable.
+    """
+    response = client.get("/api/0.6/notes.json", params={"bbox": _bbox(2 * SPREAD_DEGREES), "limit": QUERY_LIMIT})
+    response.raise_for_status()
+    count = len(response.json().get("features", []))
+    if count >= QUERY_LIMIT:
+        raise SystemExit(
+            f"El área sembrada ya tiene al menos {QUERY_LIMIT} notas; "
+            "subir DENSITY_QUERY_LIMIT o reiniciar fake OSM para poder contarlas"
+        )
+    return count
+
+
+def _seed_notes(client: httpx.Client, coordinates: Coordinates, first_index: int) -> None:
+    lats, lons = coordinates
+    notes = [
+        {"lat": lat, "lon": lon, "text": f"density-bench #{first_index + i}"}
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    ]
+    if BULK_SEED_PATH:
+        for start in range(0, len(notes), BULK_BATCH_SIZE):
+            response = client.post(BULK_SEED_PATH, json={"notes": notes[start:start + BULK_BATCH_SIZE]})
+            response.raise_for_status()
+        return
+    for note in notes:
+        response = client.post("/api/0.6/notes.json", params=note)
+        response.raise_for_status()
+
+
+def _measure_bbox(client: httpx.Client, half_side: float) -> tuple[LatencySummary, int, int]:
+    bbox = _bbox(half_side)
+    latencies = []
+    payload_size = returned = 0
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        response = client.get("/api/0.6/notes.json", params={"bbox": bbox, "limit": QUERY_LIMIT})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        payload_size = len(response.content)
+        returned = len(response.json().get("features", []))
+    return LatencySummary.from_samples(latencies), returned, payload_size
+
+
+def main() -> None:
+    rng = random.Random(SEED)
+    rows = []
+    with get_client(FAKE_OSM_BASE_URL, timeout=60.0) as client:
+        seeded = _count_notes(client)
+        print(f"Notas existentes en fake OSM: {seeded}")
+        for target in sorted(NOTE_COUNTS):
+            missing = target - seeded
+            if missing > 0:
+                print(f"Sembrando {missing} notas ({PATTERN}) hasta llegar a {target}...")
+                started = time.perf_counter()
+                _seed_notes(client, generate_coordinates(missing, rng), seeded)
+                print(f"  sembradas en {time.perf_counter() - started:.1f} s")
+                seeded = target
+            for half_side in BBOX_HALF_SIDES:
+                summary, returned, payload_size = _measure_bbox(client, half_side)
+                print(
+                    f"  {seeded} notas, bbox ±{half_side}°: p50={format_ms(summary.p50)} ms "
+                    f"p95={format_ms(summary.p95)} ms, {returned} notas, {payload_size} bytes"
+                )
+                rows.append(
+                    [
+                        seeded,
+                        f"±{half_side}",
+                        returned,
+                        format_ms(summary.p50),
+                        format_ms(summary.p95),
+                        format_ms(summary.maximum),
+                        f"{payload_size / 1024:.1f}",
+                    ]
+                )
+
+    report_path = build_table_report(
+        f"Densidad de notas ({RELEASE_LABEL})",
+        ["Notas sembradas", "Bbox (°)", "Notas devueltas", "p50 (ms)", "p95 (ms)", "Máx (ms)", "Respuesta (KB)"],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"note_density_{RELEASE_LABEL}",
+        notes=[
+            f"Patrón: {PATTERN}, dispersión ±{SPREAD_DEGREES}°, semilla {SEED}",
+            f"Centro: {TEST_LATITUDE}, {TEST_LONGITUDE}; {SAMPLES} consultas por punto",
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
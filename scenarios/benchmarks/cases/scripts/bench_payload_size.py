@@ -0,0 +1,233 @@
+"""
+Benchmark: tamaño y complejidad Unicode del texto vs. latencia.
+
+Envía texto + ubicación por Telegram y WhatsApp con textos de distintos
+tamaños (hasta el máximo de la plataforma) y escrituras (ASCII, acentos,
+emoji, RTL, combinaciones), y mide la latencia de ACK del adaptador, la
+latencia extremo a extremo hasta que la nota aparece en fake OSM y que el
+texto llegue intacto a `comments[-1].text`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.correlation import new_token, note_text, wait_for_note  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.metrics import LatencySummary, format_ms  # noqa: E402
+from tools.payloads import CHANNELS, ChannelSpec  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+PAYLOAD_CHANNELS = os.environ.get("PAYLOAD_CHANNELS", "telegram,whatsapp").split(",")
+ADAPTER_CHANNELS = PAYLOAD_CHANNELS
+# "max" equivale al límite de texto de cada plataforma.
+PAYLOAD_SIZES = os.environ.get("PAYLOAD_SIZES", "32,256,1024,max").split(",")
+PAYLOAD_REPEATS = int(os.environ.get("PAYLOAD_REPEATS", "3"))
+NOTE_TIMEOUT_SECONDS = float(os.environ.get("PAYLOAD_NOTE_TIMEOUT", "30"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+SCRIPTS = {
+    "ascii": "Hay una via cerrada por obras en la calle 26. ",
+    "latin": "Vía cerrada: camión averiado, señalización ñandú ÁÉÍÓÚ. ",
+    "emoji": "🚧 Obras 🚗💨 desvío ⚠️ 👷‍♀️👷🏽 🛑🇨🇴 ",
+    "rtl": "الطريق مغلق بسبب الأشغال הכביש סגור לתנועה ",
+    "mixed": "Cierre é ñ 道路封闭 도로 폐쇄 ‮RTL‬ Ω≈ç√ ",
+}
+
+
+# Caracteres que se pegan al grafema anterior: ZWJ, selectores de variante,
+# modificadores de tono de piel y etiquetas de subdivisión de banderas.
+ZWJ = "\u200d"
+_EXTENDERS = (("\ufe00", "\ufe0f"), ("\U0001f3fb", "\U0001f3ff"), ("\U000e0020", "\U000e007f"))
+_REGIONAL_INDICATORS = ("\U0001f1e6", "\U0001f1ff")
+
+
+def _extends(char: str) -> bool:
+    return (
+        char == ZWJ
+        or unicodedata.category(char) in ("Mn", "Mc", "Me")
+        or any(low <= char <= high for low, high in _EXTENDERS)
+    )
+
+
+def graphemes(text: str) -> list[str]:
+    """Divide el texto en grafemas (aproximación suficiente para las escrituras de `SCRIPTS`).
+
+    Mantiene juntas las secuencias con ZWJ, las marcas combinantes, los
+    modificadores de emoji y los pares de indicadores regionales (banderas).
+    """
+    clusters: list[str] = []
+    for char in text:
+        if clusters:
+            last = clusters[-1]
+            regional_pair = (
+                _REGIONAL_INDICATORS[0] <= char <= _REGIONAL_INDICATORS[1]
+                and _REGIONAL_INDICATORS[0] <= last[-1] <= _REGIONAL_INDICATORS[1]
+                and len(last) % 2 == 1
+            )
+            if _extends(char) or last[-1] == ZWJ or regional_pair:
+                clusters[-1] = last + char
+                continue
+        clusters.append(char)
+    return clusters
+
+
+def build_text(token: str, size: int, script: str, length: Callable[[str], int] = len) -> str:
+    """Texto de hasta `size` unidades de `length` que empieza con el token de correlación.
+
+    Se corta entre grafemas, así que puede quedar hasta un grafema por debajo de `size`.
+    """
+    parts = [f"{token} "]
+    total = length(parts[0])
+    for cluster in itertools.cycle(graphemes(SCRIPTS[script])):
+        cluster_length = length(cluster)
+        if total + cluster_length > size:
+            break
+        parts.append(cluster)
+        total += cluster_length
+    # Los adaptadores recortan espacios finales; no es una corrupción que interese medir.
+    if len(parts) > 1 and parts[-1].isspace():
+        parts[-1] = "."
+    return "".join(parts)
+
+
+def _resolve_size(size: str, channel: ChannelSpec) -> int:
+    return channel.max_text_length if size == "max" else int(size)
+
+
+def _run_sample(
+    channel: ChannelSpec,
+    adapter: httpx.Client,
+    fake_osm: httpx.Client,
+    user_index: int,
+    text: str,
+    token: str,
+) -> tuple[float, float, bool, int]:
+    user_id = channel.user_id(user_index)
+    text_payload = channel.text_payload(user_id, text, 2 * user_index)
+    location_payload = channel.location_payload(user_id, TEST_LATITUDE, TEST_LONGITUDE, 2 * user_index + 1)
+
+    started = time.perf_counter()
+    response = adapter.post(channel.webhook_path, json=text_payload)
+    ack_latency = time.perf_counter() - started
+    response.raise_for_status()
+    request_size = len(response.request.content)
+
+    adapter.post(channel.webhook_path, json=location_payload).raise_for_status()
+    note, seen_at = wait_for_note(fake_osm, token, timeout_seconds=NOTE_TIMEOUT_SECONDS)
+    return ack_latency, seen_at - started, text in note_text(note), request_size
+
+
+def main() -> None:
+    rows = []
+    corrupted = timeouts = errors = 0
+    # Usuarios distintos en cada ejecución para no reutilizar sesiones abiertas.
+    user_index = int(time.time()) % 100000 * 1000
+    with get_client(FAKE_OSM_BASE_URL) as fake_osm:
+        for channel_name in PAYLOAD_CHANNELS:
+            channel = CHANNELS[channel_name]
+            with get_client(channel.adapter_url) as adapter:
+                for size_spec in PAYLOAD_SIZES:
+                    size = _resolve_size(size_spec, channel)
+                    for script in SCRIPTS:
+                        acks, totals = [], []
+                        round_trips = sample_timeouts = sample_errors = request_size = 0
+                        for _ in range(PAYLOAD_REPEATS):
+                            user_index += 1
+                            token = new_token()
+                            text = build_text(token, size, script, channel.text_length)
+                            try:
+                                ack, total, intact, request_size = _run_sample(
+                                    channel, adapter, fake_osm, user_index, text, token
+                                )
+                            except TimeoutError:
+                                print(f"  ⏱ {channel.name} {size} {script}: la nota no apareció en fake OSM")
+                                sample_timeouts += 1
+                                continue
+                            except Exception as exc:  # noqa: BLE001 - se cuenta como error
+                                print(f"  ✗ {channel.name} {size} {script}: {type(exc).__name__}: {exc}")
+                                sample_errors += 1
+                                continue
+                            acks.append(ack)
+                            totals.append(total)
+                            round_trips += intact
+                        corrupted += len(totals) - round_trips
+                        timeouts += sample_timeouts
+                        errors += sample_errors
+                        ack_summary = LatencySummary.from_samples(acks)
+                        total_summary = LatencySummary.from_samples(totals)
+                        print(
+                            f"{channel.name:8} {size:5} {script:6} ack p50={format_ms(ack_summary.p50)} ms "
+                            f"e2e p50={format_ms(total_summary.p50)} ms ida y vuelta {round_trips}/{len(totals)}"
+                        )
+                        rows.append(
+                            [
+                                channel.name,
+                                size,
+                                script,
+                                request_size,
+                                format_ms(ack_summary.p50),
+                                format_ms(ack_summary.maximum),
+                                format_ms(total_summary.p50),
+                                format_ms(total_summary.maximum),
+                                f"{round_trips}/{len(totals)}",
+                                sample_timeouts,
+                                sample_errors,
+                            ]
+                        )
+
+    report_path = build_table_report(
+        f"Tamaño de texto y Unicode ({RELEASE_LABEL})",
+        [
+            "Canal",
+            "Longitud máx.",
+            "Escritura",
+            "Bytes del webhook",
+            "ACK p50 (ms)",
+            "ACK máx (ms)",
+            "E2E p50 (ms)",
+            "E2E máx (ms)",
+            "Texto intacto",
+            "Sin nota (timeout)",
+            "Errores",
+        ],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"payload_size_{RELEASE_LABEL}",
+        notes=[
+            f"{PAYLOAD_REPEATS} repeticiones por combinación, un usuario nuevo por repetición",
+            "Longitud en unidades UTF-16 para Telegram (como su límite de 4096) y en puntos de código para "
+            "WhatsApp; el texto se corta entre grafemas y puede quedar un grafema por debajo",
+            "Texto intacto: notas cuyo último comentario contiene el texto completo, sobre las notas recibidas",
+            f"Sin nota: la nota no apareció en {NOTE_TIMEOUT_SECONDS:.0f} s; errores: fallos HTTP del webhook",
+            "E2E: desde el envío del texto hasta ver la nota en fake OSM (resolución ~200 ms)",
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+    if corrupted or timeouts or errors:
+        raise AssertionError(
+            f"{corrupted} textos alterados en la nota, {timeouts} notas sin aparecer, {errors} errores de envío"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Benchmark: ciclos consecutivos de sesión por usuario (caso 4, "Reintento con
+nueva sesión", en ráfaga).
+
+Cada usuario encadena ciclos texto + ubicación tan rápido como lo permiten las
+sesiones: en cuanto aparece la nota de un ciclo, abre el siguiente. Cada nota
+se verifica por su token de correlación: debe existir una sola, contener solo
+el texto de su ciclo y la ubicación de su ciclo (cada ciclo usa coordenadas
+propias). Cualquier otra cosa indica que la sesión anterior no se cerró a
+tiempo y se mezcló con la nueva.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.correlation import NoteWatcher, new_token  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.metrics import LatencySummary, format_ms  # noqa: E402
+from tools.payload_corpus import JSON_HEADERS, PayloadCorpus  # noqa: E402
+from tools.payloads import CHANNELS  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+CHURN_CHANNELS = os.environ.get("CHURN_CHANNELS", "telegram").split(",")
+ADAPTER_CHANNELS = CHURN_CHANNELS
+USERS = int(os.environ.get("CHURN_USERS", "1"))
+CYCLES = int(os.environ.get("CHURN_CYCLES", "20"))
+# Pausa entre la nota de un ciclo y el texto del siguiente.
+THINK_SECONDS = float(os.environ.get("CHURN_THINK_SECONDS", "0"))
+NOTE_TIMEOUT_SECONDS = float(os.environ.get("CHURN_NOTE_TIMEOUT", "30"))
+POLL_INTERVAL_SECONDS = float(os.environ.get("CHURN_POLL_INTERVAL", "0.05"))
+MAX_ANOMALIES = int(os.environ.get("CHURN_MAX_ANOMALIES", "20"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+# Desplazamiento de coordenadas entre ciclos (latitud) y usuarios (longitud).
+COORDINATE_STEP = 1e-4
+
+
+@dataclass
+class Cycle:
+    channel: str
+    user: int
+    index: int
+    token: str
+    latitude: float
+    longitude: float
+    started_at: float
+    text_ack: float | None = None
+    location_ack: float | None = None
+    note_latency: float | None = None
+    error: str = ""
+    # Vacío si la nota es correcta: perdida, fusionada, ubicación ajena, duplicada.
+    anomaly: str = ""
+    note_id: object = None
+
+
+def _verify(cycle: Cycle, watcher: NoteWatcher) -> None:
+    """Comprueba la nota del ciclo buscándola por su token."""
+    notes = watcher.notes_for(cycle.token)
+    if not notes:
+        cycle.anomaly = "perdida"
+        return
+    note = notes[0]
+    properties = note.get("properties", {})
+    cycle.note_id = properties.get("id")
+    geometry = note.get("geometry", {}).get("coordinates", [])
+    if len(notes) > 1:
+        cycle.anomaly = f"duplicada ({len(notes)} notas)"
+    elif len(watcher.note_tokens.get(cycle.note_id, [])) > 1:
+        cycle.anomaly = f"fusionada con {len(watcher.note_tokens[cycle.note_id]) - 1} sesión(es)"
+    elif not (
+        len(geometry) == 2
+        and abs(float(geometry[0]) - cycle.longitude) < 1e-6
+        and abs(float(geometry[1]) - cycle.latitude) < 1e-6
+    ):
+        cycle.anomaly = f"ubicación de otra sesión {geometry}"
+
+
+def _run_user(channel_name: str, user: int, user_index: int, job: int, watcher: NoteWatcher) -> list[Cycle]:
+    channel = CHANNELS[channel_name]
+    corpus = PayloadCorpus(channel)
+    cycles = []
+    with get_client(channel.adapter_url) as adapter:
+        for index in range(CYCLES):
+            # IDs de update/mensaje únicos entre usuarios y ciclos, pequeños para no pasar de int32;
+            # los usuarios se distinguen entre ejecuciones por `user_index`.
+            seq = job * CYCLES + index
+            cycle = Cycle(
+                channel=channel_name,
+                user=user,
+                index=index,
+                token=new_token(),
+                latitude=round(TEST_LATITUDE + (index % 1000) * COORDINATE_STEP, 7),
+                longitude=round(TEST_LONGITUDE + (user % 1000) * COORDINATE_STEP, 7),
+                started_at=time.perf_counter(),
+            )
+            cycles.append(cycle)
+            try:
+                adapter.post(
+                    channel.webhook_path,
+                    content=corpus.text(user_index, cycle.token, 2 * seq),
+                    headers=JSON_HEADERS,
+                ).raise_for_status()
+                cycle.text_ack = time.perf_counter() - cycle.started_at
+                adapter.post(
+                    channel.webhook_path,
+                    content=corpus.location(user_index, cycle.latitude, cycle.longitude, 2 * seq + 1),
+                    headers=JSON_HEADERS,
+                ).raise_for_status()
+                cycle.location_ack = time.perf_counter() - cycle.started_at
+            except Exception as exc:  # noqa: BLE001 - se reporta como error del ciclo
+                cycle.error = f"{type(exc).__name__}: {exc}"
+                continue
+            if not watcher.wait_for({cycle.token}, NOTE_TIMEOUT_SECONDS):
+                cycle.note_latency = watcher.seen_at[cycle.token] - cycle.started_at
+            if THINK_SECONDS:
+                time.sleep(THINK_SECONDS)
+    return cycles
+
+
+def _latencies(cycles: list[Cycle], attribute: str) -> LatencySummary:
+    values = (getattr(cycle, attribute) for cycle in cycles)
+    return LatencySummary.from_samples([value for value in values if value is not None])
+
+
+def main() -> None:
+    user_base = int(time.time()) % 100000 * 1000
+    fake_osm = get_client(FAKE_OSM_BASE_URL)
+    watcher = NoteWatcher(fake_osm, poll_interval=POLL_INTERVAL_SECONDS).start()
+    jobs = [(name, user) for name in CHURN_CHANNELS for user in range(USERS)]
+
+    print(f"{len(jobs)} usuarios × {CYCLES} ciclos ({', '.join(CHURN_CHANNELS)})")
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="churn") as pool:
+            futures = [
+                pool.submit(_run_user, name, user, user_base + user, job, watcher)
+                for job, (name, user) in enumerate(jobs)
+            ]
+            cycles = [cycle for future in futures for cycle in future.result()]
+        elapsed = time.perf_counter() - start
+        # Un último sondeo para ver notas tardías que se hayan mezclado o duplicado, y las
+        # notas ya vistas se piden de nuevo por id para juzgarlas con su estado actual.
+        time.sleep(2 * POLL_INTERVAL_SECONDS)
+        watcher.refresh()
+        for cycle in cycles:
+            if not cycle.error:
+                _verify(cycle, watcher)
+    finally:
+        watcher.stop()
+        fake_osm.close()
+
+    channel_rows = []
+    for name in CHURN_CHANNELS:
+        channel_cycles = [c for c in cycles if c.channel == name]
+        anomalies = [c for c in channel_cycles if c.anomaly]
+        ok = [c for c in channel_cycles if not c.error and not c.anomaly]
+        reopen = _latencies([c for c in channel_cycles if c.index > 0], "text_ack")
+        note = _latencies(channel_cycles, "note_latency")
+        channel_rows.append(
+            [
+                name,
+                USERS,
+                len(channel_cycles),
+                len(ok),
+                sum(1 for c in channel_cycles if c.error),
+                sum(1 for c in anomalies if c.anomaly == "perdida"),
+                sum(1 for c in anomalies if c.anomaly.startswith("fusionada")),
+                sum(1 for c in anomalies if c.anomaly.startswith("ubicación")),
+                sum(1 for c in anomalies if c.anomaly.startswith("duplicada")),
+                format_ms(reopen.p50),
+                format_ms(note.p50),
+                format_ms(note.p95),
+                format_ms(note.p99),
+                f"{len(ok) / elapsed * 60 / USERS:.1f}",
+            ]
+        )
+        print(
+            f"{name}: {len(ok)}/{len(channel_cycles)} ciclos correctos, {len(anomalies)} anomalías, "
+            f"ciclo p50={format_ms(note.p50)} ms p95={format_ms(note.p95)} ms"
+        )
+
+    cycle_rows = []
+    for index in range(CYCLES):
+        indexed = [c for c in cycles if c.index == index]
+        note = _latencies(indexed, "note_latency")
+        cycle_rows.append(
+            [
+                index + 1,
+                len(indexed),
+                format_ms(_latencies(indexed, "text_ack").p50),
+                format_ms(_latencies(indexed, "location_ack").p50),
+                format_ms(note.p50),
+                format_ms(note.p95),
+                format_ms(note.maximum),
+                sum(1 for c in indexed if c.error or c.anomaly),
+            ]
+        )
+
+    anomaly_rows = [
+        [c.channel, c.user, c.index + 1, c.token, c.note_id if c.note_id is not None else "-", c.error or c.anomaly]
+        for c in cycles
+        if c.error or c.anomaly
+    ]
+
+    report_path = build_table_report(
+        f"Ciclos de sesión consecutivos ({RELEASE_LABEL})",
+        [
+            "Canal",
+            "Usuarios",
+            "Ciclos",
+            "Correctos",
+            "Errores",
+            "Perdidas",
+            "Fusionadas",
+            "Ubicación ajena",
+            "Duplicadas",
+            "Reapertura p50 (ms)",
+            "Ciclo p50 (ms)",
+            "Ciclo p95 (ms)",
+            "Ciclo p99 (ms)",
+            "Notas/min por usuario",
+        ],
+        channel_rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"session_churn_{RELEASE_LABEL}",
+        notes=[
+            f"{USERS} usuario(s) por canal × {CYCLES} ciclos, pausa tras cada nota: {THINK_SECONDS:g} s, "
+            f"duración total {elapsed:.1f} s",
+            "Ciclo: desde el envío del texto hasta que la nota aparece en fake OSM "
+            f"(sondeo cada {POLL_INTERVAL_SECONDS * 1000:.0f} ms)",
+            "Reapertura: ACK del texto que abre un ciclo justo después de la nota del anterior",
+            "Fusionada: la nota contiene tokens de varios ciclos; ubicación ajena: coordenadas de otro ciclo",
+        ],
+        extra_tables=[
+            (
+                "Latencia por ciclo",
+                [
+                    "Ciclo",
+                    "Usuarios",
+                    "Texto ACK p50 (ms)",
+                    "Ubicación ACK p50 (ms)",
+                    "Nota p50 (ms)",
+                    "Nota p95 (ms)",
+                    "Nota máx (ms)",
+                    "Anomalías",
+                ],
+                cycle_rows,
+            ),
+            (
+                "Anomalías",
+                ["Canal", "Usuario", "Ciclo", "Token", "Nota", "Detalle"],
+                anomaly_rows[:MAX_ANOMALIES] or [["-", "-", "-", "-", "-", "ninguna"]],
+            ),
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+    if anomaly_rows:
+        raise SystemExit(f"{len(anomaly_rows)} ciclos con errores o notas incorrectas")
+
+
+if __name__ == "__main__":
+    main()
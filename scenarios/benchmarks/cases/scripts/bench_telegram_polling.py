@@ -0,0 +1,140 @@
+"""
+Benchmark: adaptador de Telegram en modo long-polling.
+
+Levanta el emulador local de Bot API (`tools/fake_telegram_api.py`), encola
+sesiones texto + ubicación con los mismos payloads de los casos de Telegram y
+mide cómo las drena el adaptador vía `getUpdates`: latencia update→nota,
+tasa de drenado, tamaño de lote y llamadas vacías.
+
+El adaptador debe arrancarse apuntando su URL de Bot API al emulador (por
+ejemplo `TELEGRAM_API_BASE_URL=http://127.0.0.1:8081`) y en modo polling.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.correlation import NoteWatcher, new_token  # noqa: E402
+from tools.fake_telegram_api import BotAPIEmulator  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.metrics import LatencySummary, format_ms  # noqa: E402
+from tools.payloads import telegram_location_update, telegram_text_update  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+BOT_API_HOST = os.environ.get("TELEGRAM_BOT_API_HOST", "127.0.0.1")
+BOT_API_PORT = int(os.environ.get("TELEGRAM_BOT_API_PORT", "8081"))
+TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+SESSIONS = int(os.environ.get("POLLING_SESSIONS", "200"))
+# 0 encola todas las sesiones de golpe; >0 las encola a esa tasa (sesiones/s).
+ENQUEUE_RATE = float(os.environ.get("POLLING_ENQUEUE_RATE", "0"))
+READY_TIMEOUT_SECONDS = float(os.environ.get("POLLING_READY_TIMEOUT", "60"))
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("POLLING_DRAIN_TIMEOUT", "60"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+
+def _wait_for_first_poll(emulator: BotAPIEmulator) -> None:
+    deadline = time.perf_counter() + READY_TIMEOUT_SECONDS
+    while not emulator.state.polls:
+        if time.perf_counter() >= deadline:
+            raise TimeoutError(
+                f"El adaptador no llamó a getUpdates en {READY_TIMEOUT_SECONDS:.0f} s "
+                f"(¿apunta a {emulator.base_url}?)"
+            )
+        time.sleep(0.1)
+
+
+def main() -> None:
+    emulator = BotAPIEmulator(BOT_API_HOST, BOT_API_PORT, TELEGRAM_BOT_TOKEN).start()
+    print(f"Bot API emulada en {emulator.base_url}; esperando el primer getUpdates...")
+    fake_osm = get_client(FAKE_OSM_BASE_URL)
+    watcher = NoteWatcher(fake_osm).start()
+    state = emulator.state
+    try:
+        _wait_for_first_poll(emulator)
+        user_base = 500000000 + int(time.time()) % 100000 * 1000
+        tokens: dict[str, int] = {}
+        start = time.perf_counter()
+        print(f"Encolando {SESSIONS} sesiones ({2 * SESSIONS} updates)...")
+        for i in range(SESSIONS):
+            if ENQUEUE_RATE > 0:
+                delay = start + i / ENQUEUE_RATE - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            user_id = str(user_base + i)
+            token = new_token()
+            tokens[token] = state.enqueue(telegram_text_update(user_id, f"{token} Vía cerrada por obras.", 2 * i))
+            state.enqueue(telegram_location_update(user_id, TEST_LATITUDE, TEST_LONGITUDE, 2 * i + 1))
+
+        pending = watcher.wait_for(set(tokens), DRAIN_TIMEOUT_SECONDS)
+    finally:
+        watcher.stop()
+        fake_osm.close()
+        emulator.stop()
+
+    stats = state.stats()
+    update_to_note = [
+        watcher.seen_at[token] - state.enqueued_at[update_id]
+        for token, update_id in tokens.items()
+        if token in watcher.seen_at
+    ]
+    delivery = [
+        state.delivered_at[update_id] - enqueued
+        for update_id, enqueued in state.enqueued_at.items()
+        if update_id in state.delivered_at
+    ]
+    confirmed = sorted(at for at in state.confirmed_at.values() if at >= start)
+    drain_window = confirmed[-1] - start if confirmed else 0.0
+    drain_rate = len(confirmed) / drain_window if drain_window > 0 else 0.0
+    note_summary = LatencySummary.from_samples(update_to_note)
+    delivery_summary = LatencySummary.from_samples(delivery)
+
+    rows = [
+        ["Sesiones encoladas", SESSIONS],
+        ["Notas creadas", len(update_to_note)],
+        ["Notas faltantes", len(pending)],
+        ["Updates confirmados (offset)", stats["confirmed"]],
+        ["Tasa de drenado (updates/s)", f"{drain_rate:.1f}"],
+        ["Llamadas a getUpdates", stats["polls"]],
+        ["Llamadas vacías", stats["empty_polls"]],
+        ["Lote medio / máximo", f"{stats['mean_batch']:.1f} / {stats['max_batch']}"],
+        ["Encolado→entregado p50 / p99 (ms)", f"{format_ms(delivery_summary.p50)} / {format_ms(delivery_summary.p99)}"],
+        ["Update→nota p50 (ms)", format_ms(note_summary.p50)],
+        ["Update→nota p95 (ms)", format_ms(note_summary.p95)],
+        ["Update→nota p99 (ms)", format_ms(note_summary.p99)],
+        ["Update→nota máx (ms)", format_ms(note_summary.maximum)],
+        ["Mensajes enviados por el bot", stats["sent_messages"]],
+    ]
+    for name, value in rows:
+        print(f"{name}: {value}")
+
+    report_path = build_table_report(
+        f"Telegram en modo polling ({RELEASE_LABEL})",
+        ["Métrica", "Valor"],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"telegram_polling_{RELEASE_LABEL}",
+        notes=[
+            f"Bot API emulada en {emulator.base_url}",
+            "Encolado en ráfaga" if ENQUEUE_RATE <= 0 else f"Encolado a {ENQUEUE_RATE:g} sesiones/s",
+            "Update→nota: desde que el texto se encola hasta que la nota aparece en fake OSM",
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Fuzzing de webhooks de WhatsApp y Telegram con reducción de fallos.
+
+Genera a alta tasa payloads válidos y malformados (campos faltantes, tipos
+incorrectos, coordenadas extremas, arreglos y textos enormes, timestamps en
+formatos raros, anidamiento profundo, JSON truncado), los envía en paralelo
+al adaptador y marca respuestas 5xx, timeouts, errores de conexión y
+latencias atípicas. Cada fallo se reduce a un reproductor mínimo que se
+guarda en `reports/fuzz/` y, si hubo fallos, el benchmark termina en error.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.fuzzing import encode, fuzz_payload, shrink  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.metrics import format_ms  # noqa: E402
+from tools.payloads import CHANNELS, ChannelSpec  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+FUZZ_CHANNELS = os.environ.get("FUZZ_CHANNELS", "telegram,whatsapp").split(",")
+ADAPTER_CHANNELS = FUZZ_CHANNELS
+FUZZ_CASES = int(os.environ.get("FUZZ_CASES", "1000"))
+FUZZ_WORKERS = int(os.environ.get("FUZZ_WORKERS", "32"))
+FUZZ_SEED = int(os.environ.get("FUZZ_SEED", "1"))
+FUZZ_TIMEOUT_SECONDS = float(os.environ.get("FUZZ_TIMEOUT", "5"))
+OUTLIER_FACTOR = float(os.environ.get("FUZZ_OUTLIER_FACTOR", "10"))
+OUTLIER_MIN_SECONDS = float(os.environ.get("FUZZ_OUTLIER_MIN_MS", "250")) / 1000
+SHRINK_ATTEMPTS = int(os.environ.get("FUZZ_SHRINK_ATTEMPTS", "200"))
+MAX_REPRODUCERS = int(os.environ.get("FUZZ_MAX_REPRODUCERS", "20"))
+OUTPUT_DIR = Path("reports/fuzz")
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@dataclass
+class FuzzOutcome:
+    index: int
+    payload: Any
+    mutations: list[str]
+    latency: float = 0.0
+    status: int | None = None
+    failure: str = ""
+    body_size: int = 0
+
+
+def _classify(client: httpx.Client, channel: ChannelSpec, payload: Any) -> tuple[float, int | None, str]:
+    """Envía el payload y devuelve latencia, estado HTTP y tipo de fallo ('' si no falló)."""
+    started = time.perf_counter()
+    try:
+        response = client.post(channel.webhook_path, content=encode(payload), headers=JSON_HEADERS)
+    except httpx.TimeoutException:
+        return time.perf_counter() - started, None, "timeout"
+    except httpx.TransportError as exc:
+        return time.perf_counter() - started, None, f"conexión ({type(exc).__name__})"
+    latency = time.perf_counter() - started
+    return latency, response.status_code, "5xx" if response.status_code >= 500 else ""
+
+
+def _run_channel(channel: ChannelSpec) -> tuple[list[FuzzOutcome], float]:
+    def run_case(index: int) -> FuzzOutcome:
+        # Una semilla por caso para poder regenerar cualquier entrada de forma aislada.
+        payload, mutations = fuzz_payload(channel, random.Random(FUZZ_SEED * 1_000_003 + index))
+        outcome = FuzzOutcome(index=index, payload=payload, mutations=mutations, body_size=len(encode(payload)))
+        outcome.latency, outcome.status, outcome.failure = _classify(client, channel, payload)
+        return outcome
+
+    with get_client(channel.adapter_url, timeout=FUZZ_TIMEOUT_SECONDS) as client:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=FUZZ_WORKERS, thread_name_prefix="fuzz") as pool:
+            outcomes = list(pool.map(run_case, range(FUZZ_CASES)))
+        elapsed = time.perf_counter() - started
+
+    healthy = [o.latency for o in outcomes if not o.failure]
+    threshold = max(OUTLIER_FACTOR * statistics.median(healthy), OUTLIER_MIN_SECONDS) if healthy else OUTLIER_MIN_SECONDS
+    for outcome in outcomes:
+        if not outcome.failure and outcome.latency > threshold:
+            outcome.failure = "latencia atípica"
+    print(
+        f"{channel.name}: {FUZZ_CASES} casos en {elapsed:.1f} s ({FUZZ_CASES / elapsed:.0f}/s), "
+        f"umbral de latencia atípica {format_ms(threshold)} ms"
+    )
+    return outcomes, threshold
+
+
+def _reproduce(channel: ChannelSpec, outcome: FuzzOutcome, threshold: float, number: int) -> list[Any]:
+    with get_client(channel.adapter_url, timeout=FUZZ_TIMEOUT_SECONDS) as client:
+
+        def still_fails(candidate: Any) -> bool:
+            latency, _, failure = _classify(client, channel, candidate)
+            if outcome.failure == "latencia atípica":
+                return not failure and latency > threshold
+            return failure == outcome.failure
+
+        minimal, attempts = shrink(outcome.payload, still_fails, SHRINK_ATTEMPTS)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    slug = outcome.failure.split(" ")[0]
+    path = OUTPUT_DIR / f"{channel.name}_{slug}_{FUZZ_SEED}_{outcome.index}.json"
+    path.write_bytes(encode(minimal))
+    print(f"  ✗ caso {outcome.index} ({outcome.failure}): {outcome.body_size} → {path.stat().st_size} bytes")
+    return [
+        number,
+        channel.name,
+        outcome.failure,
+        ", ".join(outcome.mutations),
+        outcome.status or "-",
+        format_ms(outcome.latency),
+        f"{outcome.body_size} → {path.stat().st_size}",
+        attempts,
+        str(path),
+    ]
+
+
+def main() -> None:
+    rows = []
+    totals = []
+    failed = 0
+    for channel_name in FUZZ_CHANNELS:
+        channel = CHANNELS[channel_name]
+        outcomes, threshold = _run_channel(channel)
+        failures = [o for o in outcomes if o.failure]
+        failed += len(failures)
+        totals.append(f"{channel.name}: {len(failures)} fallos de {len(outcomes)} casos")
+
+        # Un reproductor por combinación de fallo y mutaciones para no repetir el mismo hallazgo.
+        seen: set[tuple[str, tuple[str, ...]]] = set()
+        for outcome in sorted(failures, key=lambda o: -o.latency):
+            signature = (outcome.failure, tuple(sorted(outcome.mutations)))
+            if signature in seen or len(seen) >= MAX_REPRODUCERS:
+                continue
+            seen.add(signature)
+            rows.append(_reproduce(channel, outcome, threshold, len(rows) + 1))
+
+    report_path = build_table_report(
+        "Fuzzing de webhooks",
+        ["#", "Canal", "Fallo", "Mutaciones", "HTTP", "Latencia (ms)", "Bytes original → mínimo", "Intentos", "Reproductor"],
+        rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix="fuzz_webhooks",
+        notes=[
+            f"Semilla {FUZZ_SEED}, {FUZZ_WORKERS} hilos, timeout {FUZZ_TIMEOUT_SECONDS:g} s",
+            *totals,
+            "Los reproductores de JSON truncado o anidamiento profundo no son mínimos: "
+            "solo se reducen la profundidad del anidamiento y la longitud del cuerpo",
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+    if failed:
+        raise AssertionError(f"{failed} casos de fuzzing fallaron; reproductores en {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
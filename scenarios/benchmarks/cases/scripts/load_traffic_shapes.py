@@ -0,0 +1,335 @@
+"""
+Carga con perfiles de llegada realistas: ráfagas, curva diurna y picos súbitos.
+
+Genera sesiones con el perfil `LOAD_PROFILE` (Poisson, MMPP, diurno, flash
+crowd o una traza grabada) y las reparte entre sesiones completas
+(texto + ubicación) y los casos negativos (solo texto, solo ubicación). El
+reporte muestra la latencia y la pérdida de notas durante cada ráfaga, y
+cuánto tarda el sistema en volver a su comportamiento en calma.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+# Allow running the script directly.
+import sys
+
+ROOT = Path(__file__).resolve().parents[4]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools import arrivals  # noqa: E402
+from tools.correlation import NoteWatcher, new_token  # noqa: E402
+from tools.http_client import get_client  # noqa: E402
+from tools.load import (  # noqa: E402
+    Arrival,
+    SessionResult,
+    burst_recovery,
+    calm_baseline,
+    merge_streams,
+    results_between,
+    run_open_loop,
+    summarize_stream,
+)
+from tools.metrics import format_ms  # noqa: E402
+from tools.payload_corpus import JSON_HEADERS, PayloadCorpus  # noqa: E402
+from tools.payloads import CHANNELS  # noqa: E402
+from tools.reporting import build_table_report  # noqa: E402
+
+FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
+
+TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
+TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
+
+PROFILE = os.environ.get("LOAD_PROFILE", "mmpp")
+LOAD_CHANNELS = os.environ.get("LOAD_CHANNELS", "telegram,whatsapp").split(",")
+ADAPTER_CHANNELS = LOAD_CHANNELS
+DURATION_SECONDS = float(os.environ.get("LOAD_DURATION", "120"))
+RATE = float(os.environ.get("LOAD_RATE", "2"))
+PEAK_RATE = float(os.environ.get("LOAD_PEAK_RATE", "20"))
+SEED = int(os.environ.get("LOAD_SEED", "7"))
+# MMPP: permanencia media en calma y en ráfaga (segundos).
+CALM_DWELL_SECONDS = float(os.environ.get("LOAD_CALM_DWELL", "30"))
+BURST_DWELL_SECONDS = float(os.environ.get("LOAD_BURST_DWELL", "5"))
+# Diurno: duración de un "día" comprimido.
+PERIOD_SECONDS = float(os.environ.get("LOAD_PERIOD", "60"))
+# Flash crowd: inicio, rampa, meseta y constante de decaimiento (segundos).
+FLASH_AT_SECONDS = float(os.environ.get("LOAD_FLASH_AT", "30"))
+FLASH_RAMP_SECONDS = float(os.environ.get("LOAD_FLASH_RAMP", "2"))
+FLASH_HOLD_SECONDS = float(os.environ.get("LOAD_FLASH_HOLD", "10"))
+FLASH_DECAY_SECONDS = float(os.environ.get("LOAD_FLASH_DECAY", "5"))
+# Traza: tiempos entre llegadas en segundos, uno por línea.
+TRACE_FILE = os.environ.get("LOAD_TRACE_FILE", "")
+TRACE_SPEEDUP = float(os.environ.get("LOAD_TRACE_SPEEDUP", "1"))
+# Proporción de cada tipo de sesión.
+MIX = {
+    kind: float(weight)
+    for kind, weight in (
+        item.split("=") for item in os.environ.get("LOAD_MIX", "completa=0.8,sin_ubicacion=0.1,sin_texto=0.1").split(",")
+    )
+}
+WORKERS = int(os.environ.get("LOAD_WORKERS", "64"))
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("LOAD_DRAIN_TIMEOUT", "30"))
+# Tras la última sesión negativa se sigue observando lo que tarda en expirar
+# una sesión, más un margen, para ver notas que no deberían crearse.
+SESSION_EXPIRY_SECONDS = float(os.environ.get("LOAD_SESSION_EXPIRY", "25"))
+EXPIRY_MARGIN_SECONDS = float(os.environ.get("LOAD_EXPIRY_MARGIN", "5"))
+BUCKET_SECONDS = float(os.environ.get("LOAD_BUCKET_SECONDS", "5"))
+RECOVERY_WINDOW_SECONDS = float(os.environ.get("LOAD_RECOVERY_WINDOW", "5"))
+RECOVERY_TOLERANCE = float(os.environ.get("LOAD_RECOVERY_TOLERANCE", "0.2"))
+RECOVERY_HORIZON_SECONDS = float(os.environ.get("LOAD_RECOVERY_HORIZON", "30"))
+RELEASE_LABEL = os.environ.get("RELEASE_LABEL", "local")
+
+SESSION_KINDS = ("completa", "sin_ubicacion", "sin_texto")
+# `sin_texto` no lleva token: cada sesión envía unas coordenadas propias
+# (desplazadas en longitud) y una nota en ellas se le atribuye.
+MARKER_STEP = 1e-4
+
+
+def _coordinates_key(latitude: float, longitude: float) -> tuple[float, float]:
+    return round(latitude, 6), round(longitude, 6)
+
+
+def _build_pattern(rng: random.Random) -> arrivals.TrafficPattern:
+    if PROFILE == "poisson":
+        return arrivals.poisson(RATE, DURATION_SECONDS, rng)
+    if PROFILE == "mmpp":
+        return arrivals.mmpp(RATE, PEAK_RATE, CALM_DWELL_SECONDS, BURST_DWELL_SECONDS, DURATION_SECONDS, rng)
+    if PROFILE == "diurnal":
+        return arrivals.diurnal(RATE, PEAK_RATE, PERIOD_SECONDS, DURATION_SECONDS, rng)
+    if PROFILE == "flash":
+        return arrivals.flash_crowd(
+            RATE,
+            PEAK_RATE,
+            FLASH_AT_SECONDS,
+            FLASH_RAMP_SECONDS,
+            FLASH_HOLD_SECONDS,
+            FLASH_DECAY_SECONDS,
+            DURATION_SECONDS,
+            rng,
+        )
+    if PROFILE == "replay":
+        if not TRACE_FILE:
+            raise SystemExit("LOAD_PROFILE=replay requiere LOAD_TRACE_FILE")
+        return arrivals.replay(Path(TRACE_FILE), DURATION_SECONDS, TRACE_SPEEDUP)
+    raise SystemExit(f"Perfil desconocido: {PROFILE} (poisson, mmpp, diurnal, flash, replay)")
+
+
+def _assign_streams(pattern: arrivals.TrafficPattern, rng: random.Random) -> list[Arrival]:
+    """Reparte las llegadas en flujos `<canal>:<tipo>` según `LOAD_MIX`."""
+    kinds = [kind for kind in SESSION_KINDS if MIX.get(kind, 0) > 0]
+    weights = [MIX[kind] for kind in kinds]
+    streams: dict[str, list[float]] = {}
+    for at in pattern.times:
+        stream = f"{rng.choice(LOAD_CHANNELS)}:{rng.choices(kinds, weights)[0]}"
+        streams.setdefault(stream, []).append(at)
+    return merge_streams(streams)
+
+
+def main() -> None:
+    rng = random.Random(SEED)
+    pattern = _build_pattern(rng)
+    arrival_list = _assign_streams(pattern, rng)
+    user_base = int(time.time()) % 100000 * 1000
+    user_lock = threading.Lock()
+    next_user = itertools.count(user_base)
+    next_marker = itertools.count(1)
+    markers: dict[tuple[float, float], SessionResult] = {}
+
+    adapters = {name: get_client(CHANNELS[name].adapter_url) for name in LOAD_CHANNELS}
+    corpora = {name: PayloadCorpus(CHANNELS[name]) for name in LOAD_CHANNELS}
+    fake_osm = get_client(FAKE_OSM_BASE_URL)
+    watcher = NoteWatcher(fake_osm).start()
+
+    def session(arrival: Arrival, scheduled_at: float) -> SessionResult:
+        channel_name, kind = arrival.stream.split(":")
+        channel = CHANNELS[channel_name]
+        corpus = corpora[channel_name]
+        token = new_token()
+        result = SessionResult(stream=arrival.stream, token=token, scheduled_at=scheduled_at)
+        latitude, longitude = TEST_LATITUDE, TEST_LONGITUDE
+        with user_lock:
+            user_index = next(next_user)
+            if kind == "sin_texto":
+                longitude = round(TEST_LONGITUDE + next(next_marker) * MARKER_STEP, 7)
+                markers[_coordinates_key(latitude, longitude)] = result
+        bodies = []
+        if kind != "sin_texto":
+            bodies.append(corpus.text(user_index, token, 2 * user_index))
+        if kind != "sin_ubicacion":
+            bodies.append(corpus.location(user_index, latitude, longitude, 2 * user_index + 1))
+        try:
+            for body in bodies:
+                adapters[channel_name].post(channel.webhook_path, content=body, headers=JSON_HEADERS).raise_for_status()
+        except Exception as exc:  # noqa: BLE001 - se reporta como error de la sesión
+            result.error = f"{type(exc).__name__}: {exc}"
+        result.ack_latency = time.perf_counter() - scheduled_at
+        return result
+
+    print(
+        f"Perfil {pattern.name}: {len(arrival_list)} sesiones en {pattern.duration:.0f} s "
+        f"(media {pattern.mean_rate:.2f}/s, {len(pattern.bursts)} ráfagas)"
+    )
+    try:
+        results, start = run_open_loop(arrival_list, session, max_workers=WORKERS)
+        expected = {r.token for r in results if r.stream.endswith(":completa") and not r.error}
+        print(f"Esperando hasta {DRAIN_TIMEOUT_SECONDS:.0f} s por {len(expected)} notas...")
+        watcher.wait_for(expected, DRAIN_TIMEOUT_SECONDS)
+        negatives = [r for r in results if not r.stream.endswith(":completa") and not r.error]
+        if negatives:
+            last_sent = max(r.scheduled_at + (r.ack_latency or 0.0) for r in negatives)
+            remaining = last_sent + SESSION_EXPIRY_SECONDS + EXPIRY_MARGIN_SECONDS - time.perf_counter()
+            if remaining > 0:
+                print(f"Observando {remaining:.0f} s más por notas de {len(negatives)} sesiones negativas...")
+                time.sleep(remaining)
+    finally:
+        watcher.stop()
+        fake_osm.close()
+        for client in adapters.values():
+            client.close()
+
+    for result in results:
+        result.note_seen_at = watcher.seen_at.get(result.token)
+    for note_id, note in watcher.notes.items():
+        coordinates = note.get("geometry", {}).get("coordinates", [])
+        if len(coordinates) == 2:
+            marked = markers.get(_coordinates_key(float(coordinates[1]), float(coordinates[0])))
+            if marked is not None and marked.note_seen_at is None:
+                marked.note_seen_at = watcher.note_seen_at[note_id]
+    complete = [r for r in results if r.stream.endswith(":completa")]
+
+    kind_rows = []
+    for kind in SESSION_KINDS:
+        kind_results = [r for r in results if r.stream.endswith(f":{kind}")]
+        if not kind_results:
+            continue
+        summary = summarize_stream(kind, kind_results, start)
+        expects_note = kind == "completa"
+        kind_rows.append(
+            [
+                kind,
+                summary.sent,
+                summary.errors,
+                summary.lost if expects_note else "-",
+                "-" if expects_note else summary.notes,
+                format_ms(summary.ack.p50),
+                format_ms(summary.ack.p99),
+                format_ms(summary.e2e.p50) if expects_note else "-",
+                format_ms(summary.e2e.p95) if expects_note else "-",
+                format_ms(summary.e2e.p99) if expects_note else "-",
+            ]
+        )
+        print(f"{kind:14} enviadas={summary.sent} errores={summary.errors} notas={summary.notes}")
+
+    baseline = calm_baseline(complete, start, pattern.bursts, RECOVERY_HORIZON_SECONDS)
+    recoveries = burst_recovery(
+        complete,
+        start,
+        pattern.bursts,
+        baseline,
+        RECOVERY_WINDOW_SECONDS,
+        RECOVERY_TOLERANCE,
+        RECOVERY_HORIZON_SECONDS,
+    )
+    burst_rows = []
+    for number, recovery in enumerate(recoveries, start=1):
+        burst_rows.append(
+            [
+                number,
+                f"{recovery.begin:.1f}–{recovery.end:.1f}",
+                recovery.during.sent,
+                f"{recovery.rate:.1f}",
+                format_ms(recovery.during.e2e.p95),
+                format_ms(recovery.during.e2e.maximum),
+                recovery.during.lost,
+                format_ms(recovery.after.e2e.p95),
+                recovery.after.lost,
+                "sin recuperar" if recovery.recovery is None else f"{recovery.recovery:.1f}",
+            ]
+        )
+        state = "sin recuperar" if recovery.recovery is None else f"recuperado en {recovery.recovery:.1f} s"
+        print(f"ráfaga {number} ({recovery.begin:.1f}–{recovery.end:.1f} s): {state}")
+
+    timeline_rows = []
+    offset = 0.0
+    while offset < pattern.duration:
+        bucket = results_between(results, start, offset, offset + BUCKET_SECONDS)
+        bucket_complete = [r for r in bucket if r.stream.endswith(":completa")]
+        summary = summarize_stream("intervalo", bucket_complete, start)
+        in_burst = any(begin < offset + BUCKET_SECONDS and offset < end for begin, end in pattern.bursts)
+        timeline_rows.append(
+            [
+                f"{offset:.0f}",
+                len(bucket),
+                f"{len(bucket) / BUCKET_SECONDS:.1f}",
+                format_ms(summarize_stream("intervalo", bucket, start).ack.p99),
+                format_ms(summary.e2e.p50),
+                format_ms(summary.e2e.p99),
+                summary.lost,
+                "sí" if in_burst else "",
+            ]
+        )
+        offset += BUCKET_SECONDS
+
+    report_path = build_table_report(
+        f"Perfiles de llegada: {pattern.name} ({RELEASE_LABEL})",
+        [
+            "Sesión",
+            "Enviadas",
+            "Errores",
+            "Notas perdidas",
+            "Notas inesperadas",
+            "ACK p50 (ms)",
+            "ACK p99 (ms)",
+            "E2E p50 (ms)",
+            "E2E p95 (ms)",
+            "E2E p99 (ms)",
+        ],
+        kind_rows,
+        output_dir=Path("reports/benchmarks"),
+        filename_prefix=f"traffic_{pattern.name}_{RELEASE_LABEL}",
+        notes=[
+            f"Perfil {pattern.name}, semilla {SEED}: {len(arrival_list)} sesiones en {pattern.duration:.0f} s "
+            f"(media {pattern.mean_rate:.2f}/s), canales {', '.join(LOAD_CHANNELS)}",
+            "Mezcla: " + ", ".join(f"{kind}={weight:g}" for kind, weight in MIX.items()),
+            f"p95 E2E en calma: {format_ms(baseline)} ms; recuperado = primera ventana de "
+            f"{RECOVERY_WINDOW_SECONDS:g} s sin pérdidas y con p95 ≤ calma × {1 + RECOVERY_TOLERANCE:g}",
+            "Notas inesperadas: notas con el token de una sesión sin_ubicacion o en las coordenadas propias de "
+            f"una sesión sin_texto, observadas hasta {SESSION_EXPIRY_SECONDS + EXPIRY_MARGIN_SECONDS:g} s "
+            "después de la última sesión negativa",
+        ],
+        extra_tables=[
+            (
+                "Ráfagas y recuperación",
+                [
+                    "#",
+                    "Ventana (s)",
+                    "Sesiones",
+                    "Tasa (ses/s)",
+                    "E2E p95 en ráfaga (ms)",
+                    "E2E máx en ráfaga (ms)",
+                    "Perdidas en ráfaga",
+                    "E2E p95 después (ms)",
+                    "Perdidas después",
+                    "Recuperación (s)",
+                ],
+                burst_rows,
+            ),
+            (
+                f"Evolución por intervalos de {BUCKET_SECONDS:g} s",
+                ["Desde (s)", "Sesiones", "Tasa (ses/s)", "ACK p99 (ms)", "E2E p50 (ms)", "E2E p99 (ms)", "Perdidas", "Ráfaga"],
+                timeline_rows,
+            ),
+        ],
+    )
+    print(f"📝 Reporte: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
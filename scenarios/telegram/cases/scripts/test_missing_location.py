@@ -13,8 +13,6 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-import httpx
-
 # Allow running the script directly.
 import sys
 
@@ -22,7 +20,10 @@ ROOT = Path(__file__).resolve().parents[4]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from tools.http_client import get_client  # noqa: E402
+from tools.log_archive import write_run_log  # noqa: E402
 from tools.reporting import CaseResult, build_markdown_report, consolidate_reports  # noqa: E402
+from tools.tracing import trace_headers  # noqa: E402
 
 CORE_BASE_URL = os.environ.get("CORE_BASE_URL", "http://localhost:8002")
 ADAPTER_BASE_URL = os.environ.get("ADAPTER_BASE_URL", "http://localhost:3000")
@@ -32,13 +33,11 @@ LOG_DIR = Path(os.environ.get("LOG_DIR", "./logs"))
 TEST_USER_ID = int(os.environ.get("TEST_USER_ID", "123456789"))
 TEST_MESSAGE = os.environ.get("TEST_MESSAGE", "Hay una vía cerrada por obras.")
 
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def _send_to_adapter(payload: dict) -> dict:
     """Envía un webhook update de Telegram al adaptador."""
-    with httpx.Client(base_url=ADAPTER_BASE_URL, timeout=10.0) as client:
-        response = client.post("/telegram/webhook", json=payload)
+    with get_client(ADAPTER_BASE_URL) as client:
+        response = client.post("/telegram/webhook", json=payload, headers=trace_headers())
         response.raise_for_status()
         return response.json()
 
@@ -50,7 +49,7 @@ def _format_timestamp() -> int:
 
 def _fetch_callback_events() -> list[dict[str, Any]]:
     """Recupera eventos registrados en fake OSM (simula callback)."""
-    with httpx.Client(base_url=FAKE_OSM_BASE_URL, timeout=10.0) as client:
+    with get_client(FAKE_OSM_BASE_URL) as client:
         response = client.get("/__control__/events")
         response.raise_for_status()
         return response.json()
@@ -58,18 +57,16 @@ def _fetch_callback_events() -> list[dict[str, Any]]:
 
 def _fetch_latest_note() -> dict[str, Any] | None:
     """Obtiene la última nota creada en fake OSM, o None si no hay notas."""
-    with httpx.Client(base_url=FAKE_OSM_BASE_URL, timeout=10.0) as client:
+    with get_client(FAKE_OSM_BASE_URL) as client:
         response = client.get("/api/0.6/notes.json")
         response.raise_for_status()
         notes = response.json().get("features", [])
         return notes[-1] if notes else None
 
 
-def _write_log(filename: str, content: str) -> Path:
-    """Escribe un archivo de log."""
-    output_path = LOG_DIR / filename
-    output_path.write_text(content, encoding="utf-8")
-    return output_path
+def _write_log(filename: str, content: str) -> str:
+    """Guarda el registro de la ejecución (archivo suelto o archivo comprimido)."""
+    return write_run_log(filename, content, LOG_DIR)
 
 
 def main() -> None:
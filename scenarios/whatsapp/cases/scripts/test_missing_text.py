@@ -10,9 +10,10 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-import httpx
-
+from tools.http_client import get_client
+from tools.log_archive import write_run_log
 from tools.reporting import CaseResult, build_markdown_report
+from tools.tracing import trace_headers
 
 ADAPTER_BASE_URL = os.environ.get("ADAPTER_BASE_URL", "http://localhost:8001")
 FAKE_OSM_BASE_URL = os.environ.get("FAKE_OSM_BASE_URL", "http://localhost:8080")
@@ -22,18 +23,16 @@ TEST_USER_MSISDN = os.environ.get("TEST_USER_MSISDN", "573000000000")
 TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
 TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
 
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def _send_to_adapter(payload: dict) -> dict:
-    with httpx.Client(base_url=ADAPTER_BASE_URL, timeout=10.0) as client:
-        response = client.post("/webhook", json=payload)
+    with get_client(ADAPTER_BASE_URL) as client:
+        response = client.post("/webhook", json=payload, headers=trace_headers())
         response.raise_for_status()
         return response.json()
 
 
 def _fetch_callback_events() -> list[dict[str, Any]]:
-    with httpx.Client(base_url=FAKE_OSM_BASE_URL, timeout=10.0) as client:
+    with get_client(FAKE_OSM_BASE_URL) as client:
         response = client.get("/__control__/events")
         response.raise_for_status()
         return response.json()
@@ -94,8 +93,7 @@ def main() -> None:
 
     log_content = f"Ubicación sin texto:\n{response}\nEventos:\n{events}\n"
     timestamp = datetime.now().isoformat()
-    log_path = LOG_DIR / f"whatsapp_missing_text_{timestamp}.log"
-    log_path.write_text(log_content, encoding="utf-8")
+    log_path = write_run_log(f"whatsapp_missing_text_{timestamp}.log", log_content, LOG_DIR)
 
     report_path = build_markdown_report(
         [
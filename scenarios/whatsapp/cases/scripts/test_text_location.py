@@ -14,8 +14,6 @@ from pathlib import Path
 import time
 from typing import Any
 
-import httpx
-
 # Allow running the script directly.
 import sys
 
@@ -23,7 +21,10 @@ ROOT = Path(__file__).resolve().parents[4]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from tools.http_client import get_client  # noqa: E402
+from tools.log_archive import write_run_log  # noqa: E402
 from tools.reporting import CaseResult, build_markdown_report, consolidate_reports  # noqa: E402
+from tools.tracing import trace_headers  # noqa: E402
 
 CORE_BASE_URL = os.environ.get("CORE_BASE_URL", "http://localhost:8000")
 ADAPTER_BASE_URL = os.environ.get("ADAPTER_BASE_URL", "http://localhost:8001")
@@ -35,12 +36,10 @@ TEST_MESSAGE = os.environ.get("TEST_MESSAGE", "Hay una vía cerrada por obras.")
 TEST_LATITUDE = float(os.environ.get("TEST_LATITUDE", "4.711"))
 TEST_LONGITUDE = float(os.environ.get("TEST_LONGITUDE", "-74.0721"))
 
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def _send_to_adapter(payload: dict) -> dict:
-    with httpx.Client(base_url=ADAPTER_BASE_URL, timeout=10.0) as client:
-        response = client.post("/webhook", json=payload)
+    with get_client(ADAPTER_BASE_URL) as client:
+        response = client.post("/webhook", json=payload, headers=trace_headers())
         response.raise_for_status()
         return response.json()
 
@@ -51,7 +50,7 @@ def _format_timestamp() -> str:
 
 def _fetch_callback_events() -> list[dict[str, Any]]:
     """Recupera eventos registrados en fake OSM (simula callback)."""
-    with httpx.Client(base_url=FAKE_OSM_BASE_URL, timeout=10.0) as client:
+    with get_client(FAKE_OSM_BASE_URL) as client:
         response = client.get("/__control__/events")
         response.raise_for_status()
         return response.json()
@@ -75,7 +74,7 @@ def _wait_for_note_created_event(
 
 
 def _fetch_latest_note() -> dict[str, Any]:
-    with httpx.Client(base_url=FAKE_OSM_BASE_URL, timeout=10.0) as client:
+    with get_client(FAKE_OSM_BASE_URL) as client:
         response = client.get("/api/0.6/notes.json")
         response.raise_for_status()
         notes = response.json().get("features", [])
@@ -84,10 +83,8 @@ def _fetch_latest_note() -> dict[str, Any]:
         return notes[-1]
 
 
-def _write_log(filename: str, content: str) -> Path:
-    output_path = LOG_DIR / filename
-    output_path.write_text(content, encoding="utf-8")
-    return output_path
+def _write_log(filename: str, content: str) -> str:
+    return write_run_log(filename, content, LOG_DIR)
 
 
 def main() -> None:
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from tools.arrivals import mmpp, poisson, replay
+
+
+def test_poisson_mean_rate():
+    pattern = poisson(5.0, 2000.0, random.Random(1))
+    assert pattern.mean_rate == pytest.approx(5.0, rel=0.05)
+    assert all(0 <= t < 2000.0 for t in pattern.times)
+
+
+def test_mmpp_mean_rate_matches_stationary_mix():
+    pattern = mmpp(1.0, 10.0, 20.0, 5.0, 20000.0, random.Random(1))
+    # Media ponderada por el tiempo esperado en cada estado: (1·20 + 10·5) / 25.
+    assert pattern.mean_rate == pytest.approx(2.8, rel=0.1)
+    assert pattern.bursts
+    assert all(0 <= start < end <= 20000.0 for start, end in pattern.bursts)
+
+
+@pytest.mark.parametrize(
+    "calm_rate, burst_rate, calm_dwell, burst_dwell",
+    [(1.0, 10.0, 0.0, 5.0), (1.0, 10.0, 20.0, 0.0), (-1.0, 10.0, 20.0, 5.0), (1.0, -10.0, 20.0, 5.0)],
+)
+def test_mmpp_rejects_invalid_parameters(calm_rate, burst_rate, calm_dwell, burst_dwell):
+    with pytest.raises(ValueError):
+        mmpp(calm_rate, burst_rate, calm_dwell, burst_dwell, 60.0, random.Random(1))
+
+
+def test_replay_is_monotonic(tmp_path):
+    trace = tmp_path / "gaps.txt"
+    trace.write_text("# traza\n0.5\n0\n1.25  # simultánea antes\n0.25\n", encoding="utf-8")
+
+    once = replay(trace)
+    assert once.times == [0.5, 0.5, 1.75, 2.0]
+
+    repeated = replay(trace, duration=30.0, speedup=2.0)
+    assert repeated.times == sorted(repeated.times)
+    assert repeated.times[-1] < 30.0
+    assert len(repeated.times) == 4 * 30 - 1
+
+
+@pytest.mark.parametrize("content", ["0.5\n-0.1\n", "0.5\nabc\n", "0\n0\n"])
+def test_replay_rejects_invalid_gaps(tmp_path, content):
+    trace = tmp_path / "gaps.txt"
+    trace.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError):
+        replay(trace)
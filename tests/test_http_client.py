@@ -0,0 +1,17 @@
+import httpx
+import pytest
+
+from tools.http_client import series_name
+
+
+@pytest.mark.parametrize(
+    "url, series",
+    [
+        ("http://osm.test/api/0.6/notes/123.json", "GET osm.test/api/0.6/notes/{id}.json"),
+        ("http://osm.test/api/0.6/notes.json", "GET osm.test/api/0.6/notes.json"),
+        ("http://osm.test/api/0.6/notes/42/comment", "GET osm.test/api/0.6/notes/{id}/comment"),
+        ("http://core.test/sessions/3f2a1b4c-1234-4abc-9def-0123456789ab", "GET core.test/sessions/{id}"),
+    ],
+)
+def test_series_name_templates_ids(url, series):
+    assert series_name(httpx.Request("GET", url)) == series
@@ -0,0 +1,23 @@
+from tools.log_archive import LogArchive
+
+
+def test_round_trip_skips_truncated_index_line(tmp_path, capsys):
+    archive = LogArchive(tmp_path)
+    first = archive.append("run-1", "primera ejecución\n")
+    archive.append("run-2", "segunda ejecución\n")
+
+    # Un proceso que muere a mitad de escribir deja la última línea del índice cortada.
+    index = tmp_path / "segment-000001.idx"
+    lines = index.read_text(encoding="utf-8").splitlines(keepends=True)
+    index.write_text(lines[0] + lines[1][: len(lines[1]) // 2], encoding="utf-8")
+
+    assert [entry.run_id for entry in archive.entries()] == ["run-1"]
+    assert archive.read(archive.find(first)) == "primera ejecución\n"
+    assert archive.find("run-2") is None
+    assert "segment-000001.idx:2" in capsys.readouterr().err
+
+    # Las escrituras posteriores siguen siendo legibles.
+    archive.append("run-3", "tercera ejecución\n")
+    entry = archive.find("run-3")
+    assert entry is not None
+    assert archive.read(entry) == "tercera ejecución\n"
@@ -0,0 +1,60 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from tools.metrics import bootstrap_delta, compare_samples, mann_whitney
+
+
+def _blocks(rng, shift=0.0, count=20, size=30):
+    return [[rng.gauss(100.0, 10.0) + shift for _ in range(size)] for _ in range(count)]
+
+
+def test_bootstrap_same_distribution_contains_zero():
+    rng = random.Random(7)
+    a, b = _blocks(rng), _blocks(rng)
+    delta, low, high = bootstrap_delta(a, b, statistics.fmean, random.Random(1), iterations=1000)
+    assert low <= 0 <= high
+    assert low <= delta <= high
+
+
+def test_bootstrap_identical_blocks_have_zero_width_interval():
+    a = _blocks(random.Random(7))
+    assert bootstrap_delta(a, a, statistics.fmean, random.Random(1), iterations=200) == (0.0, 0.0, 0.0)
+
+
+def test_bootstrap_shifted_sample_excludes_zero():
+    rng = random.Random(7)
+    a, b = _blocks(rng), _blocks(rng, shift=5.0)
+    comparison = compare_samples(a, b, statistics.fmean, random.Random(1), iterations=1000)
+    assert comparison.low > 0
+    assert comparison.significant
+    assert comparison.delta == pytest.approx(5.0, abs=1.5)
+
+
+def test_mann_whitney_identical_samples():
+    rng = random.Random(3)
+    sample = [rng.random() for _ in range(50)]
+    u_b, p = mann_whitney(sample, sample)
+    assert u_b == 50 * 50 / 2
+    assert p == pytest.approx(1.0)
+
+
+def test_mann_whitney_u_matches_hand_count():
+    # Pares (a, b) con b > a: 2>1, 4>1, 4>3.
+    assert mann_whitney([1, 3, 5], [2, 4])[0] == 3
+    assert mann_whitney([1, 2, 3], [4, 5])[0] == 6
+
+
+def test_mann_whitney_tie_correction():
+    a, b = [1, 2, 2, 3], [2, 3, 3, 4]
+    u_b, p = mann_whitney(a, b)
+    # Rangos promedio: 2→3 y 3→6; los empates cuentan medio par.
+    assert u_b == 13
+    # Varianza corregida: 4·4/12 · (9 - (24 + 24) / (8·7)) = 76/7.
+    expected = math.erfc((abs(13 - 8) - 0.5) / math.sqrt(76 / 7) / math.sqrt(2))
+    assert p == pytest.approx(expected)
+
+    # Todo empate: la varianza es cero y no hay valor p.
+    assert math.isnan(mann_whitney([2, 2], [2, 2])[1])
@@ -0,0 +1,66 @@
+"""Punto de entrada único: `python -m tools <comando>`.
+
+- `list`: casos registrados (sin importar los scripts ni `httpx`); `--kind bench`
+  lista los benchmarks.
+- `run`: ejecuta los casos seleccionados con `tools.runner`; acepta sus mismas
+  opciones (`python -m tools run --help`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from tools.registry import KINDS, discover_cases
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tools", description="Pruebas end-to-end de Terranote")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="Lista los casos disponibles")
+    list_parser.add_argument("--channel", action="append", help="Canal a listar (repetible)")
+    list_parser.add_argument("--case", action="append", help="Caso a listar, p. ej. text_location (repetible)")
+    list_parser.add_argument(
+        "--kind", action="append", choices=KINDS, help="Tipo: case (por defecto) o bench (repetible)"
+    )
+    list_parser.add_argument("--json", action="store_true", help="Salida en JSON para otras herramientas")
+    # Las opciones de `run` las valida tools.runner, que solo se importa al ejecutar.
+    commands.add_parser("run", help="Ejecuta los casos (ver `python -m tools run --help`)", add_help=False)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "run":
+        from tools.runner import main as run_main
+
+        return run_main(extra)
+    if extra:
+        parser.error(f"argumentos no reconocidos: {' '.join(extra)}")
+
+    cases = discover_cases(args.channel, args.case, args.kind)
+    if args.json:
+        print(json.dumps(
+            [
+                {
+                    "case": case.label,
+                    "kind": case.kind,
+                    "path": str(case.path),
+                    "description": case.description,
+                    "url_vars": list(case.url_vars),
+                }
+                for case in cases
+            ],
+            indent=2,
+            ensure_ascii=False,
+        ))
+    else:
+        for case in cases:
+            print(f"{case.label:36} {case.kind:5} {case.description}")
+    return 0 if cases else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Modelos de llegadas para el generador de carga.
+
+Una tasa constante oculta los problemas de encolamiento: los reportes de vías
+cerradas llegan en ráfagas tras un incidente. Estos perfiles producen los
+instantes de llegada (segundos desde el inicio) junto con las ventanas de
+ráfaga conocidas, para medir después cómo se recupera el sistema:
+
+- `poisson`: llegadas independientes a tasa media fija.
+- `mmpp`: proceso de Poisson modulado por Markov (calma ↔ ráfaga).
+- `diurnal`: curva diaria comprimida (sinusoide) generada por *thinning*.
+- `flash_crowd`: pico súbito con rampa, meseta y decaimiento.
+- `replay`: reproduce una traza de tiempos entre llegadas grabada.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+Window = tuple[float, float]
+
+
+@dataclass
+class TrafficPattern:
+    name: str
+    times: list[float]
+    duration: float
+    bursts: list[Window] = field(default_factory=list)
+
+    @property
+    def mean_rate(self) -> float:
+        return len(self.times) / self.duration if self.duration > 0 else 0.0
+
+
+def poisson(rate: float, duration: float, rng: random.Random) -> TrafficPattern:
+    _check_non_negative(rate=rate)
+    return TrafficPattern("poisson", _poisson_times(rate, 0.0, duration, rng), duration)
+
+
+def mmpp(
+    calm_rate: float,
+    burst_rate: float,
+    calm_dwell: float,
+    burst_dwell: float,
+    duration: float,
+    rng: random.Random,
+) -> TrafficPattern:
+    """Alterna calma y ráfaga con permanencias exponenciales de media `*_dwell` segundos."""
+    _check_non_negative(calm_rate=calm_rate, burst_rate=burst_rate)
+    if calm_dwell <= 0 or burst_dwell <= 0:
+        raise ValueError(f"Las permanencias deben ser positivas: calm_dwell={calm_dwell}, burst_dwell={burst_dwell}")
+    times: list[float] = []
+    bursts: list[Window] = []
+    now = 0.0
+    bursting = False
+    while now < duration:
+        end = min(now + rng.expovariate(1.0 / (burst_dwell if bursting else calm_dwell)), duration)
+        times.extend(_poisson_times(burst_rate if bursting else calm_rate, now, end, rng))
+        if bursting:
+            bursts.append((now, end))
+        now = end
+        bursting = not bursting
+    return TrafficPattern("mmpp", times, duration, bursts)
+
+
+def diurnal(
+    base_rate: float,
+    peak_rate: float,
+    period: float,
+    duration: float,
+    rng: random.Random,
+    peak_at: float | None = None,
+) -> TrafficPattern:
+    """Sinusoide entre `base_rate` y `peak_rate` con periodo `period` (un "día" comprimido).
+
+    Las horas pico (tasa por encima del punto medio) se reportan como ráfagas.
+    """
+    _check_non_negative(base_rate=base_rate, peak_rate=peak_rate)
+    if period <= 0:
+        raise ValueError(f"El periodo debe ser positivo: period={period}")
+    peak_at = period / 2 if peak_at is None else peak_at
+
+    def rate(t: float) -> float:
+        return base_rate + (peak_rate - base_rate) * (1 + math.cos(2 * math.pi * (t - peak_at) / period)) / 2
+
+    times = _thinning(rate, max(base_rate, peak_rate), duration, rng)
+    bursts = []
+    # Sobre el punto medio durante medio periodo centrado en cada pico.
+    center = peak_at % period - period
+    while center - period / 4 < duration:
+        start, end = max(center - period / 4, 0.0), min(center + period / 4, duration)
+        if end > start:
+            bursts.append((start, end))
+        center += period
+    return TrafficPattern("diurnal", times, duration, bursts)
+
+
+def flash_crowd(
+    base_rate: float,
+    peak_rate: float,
+    start: float,
+    ramp: float,
+    hold: float,
+    decay: float,
+    duration: float,
+    rng: random.Random,
+) -> TrafficPattern:
+    """Tasa base con un pico: rampa lineal, meseta y decaimiento exponencial (constante `decay`)."""
+    _check_non_negative(base_rate=base_rate, peak_rate=peak_rate)
+
+    def rate(t: float) -> float:
+        if t < start:
+            return base_rate
+        if t < start + ramp:
+            return base_rate + (peak_rate - base_rate) * (t - start) / ramp
+        if t < start + ramp + hold:
+            return peak_rate
+        return base_rate + (peak_rate - base_rate) * math.exp(-(t - start - ramp - hold) / max(decay, 1e-9))
+
+    times = _thinning(rate, max(base_rate, peak_rate), duration, rng)
+    return TrafficPattern("flash_crowd", times, duration, [(start, min(start + ramp + hold, duration))])
+
+
+def replay(
+    path: Path,
+    duration: float | None = None,
+    speedup: float = 1.0,
+    burst_factor: float = 3.0,
+    burst_window: float = 5.0,
+) -> TrafficPattern:
+    """Reproduce tiempos entre llegadas (segundos, uno por línea; `#` comenta).
+
+    Con `duration` la traza se repite hasta cubrirla. Las ráfagas se detectan
+    con `detect_bursts`, porque la traza no trae esa información.
+    """
+    if speedup <= 0:
+        raise ValueError(f"El factor de aceleración debe ser positivo: speedup={speedup}")
+    gaps = []
+    for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        value = line.split("#", 1)[0].strip()
+        if not value:
+            continue
+        try:
+            gap = float(value)
+        except ValueError:
+            raise ValueError(f"{path}:{number}: '{value}' no es un tiempo entre llegadas") from None
+        # Un intervalo negativo haría retroceder los instantes de llegada.
+        if not gap >= 0:
+            raise ValueError(f"{path}:{number}: tiempo entre llegadas negativo o inválido ({value})")
+        gaps.append(gap)
+    if not gaps or sum(gaps) <= 0:
+        raise ValueError(f"La traza {path} no tiene tiempos entre llegadas positivos")
+    times: list[float] = []
+    now = 0.0
+    index = 0
+    while True:
+        now += gaps[index % len(gaps)] / speedup
+        index += 1
+        if duration is None and index > len(gaps):
+            break
+        if duration is not None and now >= duration:
+            break
+        times.append(now)
+    total = duration if duration is not None else (times[-1] if times else 0.0)
+    return TrafficPattern("replay", times, total, detect_bursts(times, total, burst_window, burst_factor))
+
+
+def detect_bursts(times: list[float], duration: float, window: float, factor: float) -> list[Window]:
+    """Ventanas consecutivas cuya tasa supera `factor` veces la tasa media."""
+    if not times or duration <= 0:
+        return []
+    threshold = factor * len(times) / duration
+    counts = [0] * (int(duration // window) + 1)
+    for t in times:
+        counts[int(t // window)] += 1
+    bursts: list[Window] = []
+    for index, count in enumerate(counts):
+        if count / window <= threshold:
+            continue
+        start, end = index * window, min((index + 1) * window, duration)
+        if bursts and bursts[-1][1] == start:
+            bursts[-1] = (bursts[-1][0], end)
+        else:
+            bursts.append((start, end))
+    return bursts
+
+
+def _check_non_negative(**rates: float) -> None:
+    for name, rate in rates.items():
+        if not rate >= 0:
+            raise ValueError(f"La tasa no puede ser negativa: {name}={rate}")
+
+
+def _poisson_times(rate: float, start: float, end: float, rng: random.Random) -> list[float]:
+    times = []
+    if rate <= 0:
+        return times
+    now = start + rng.expovariate(rate)
+    while now < end:
+        times.append(now)
+        now += rng.expovariate(rate)
+    return times
+
+
+def _thinning(rate: Callable[[float], float], max_rate: float, duration: float, rng: random.Random) -> list[float]:
+    """Poisson no homogéneo (Lewis-Shedler): candidatos a `max_rate`, aceptados con `rate(t)/max_rate`."""
+    return [t for t in _poisson_times(max_rate, 0.0, duration, rng) if rng.random() * max_rate < rate(t)]
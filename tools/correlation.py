@@ -0,0 +1,154 @@
+"""Correlación de mensajes enviados con las notas creadas en fake OSM.
+
+Cada mensaje de un benchmark lleva un token único en el texto; la nota
+correspondiente se localiza buscando ese token en el último comentario.
+"""
+
+from __future__ import annotations
+
+import re
+import secrets
+import threading
+import time
+from typing import Any
+
+import httpx
+
+NOTES_PATH = "/api/0.6/notes.json"
+NOTE_PATH = "/api/0.6/notes/{}.json"
+TOKEN_PATTERN = re.compile(r"tn[0-9a-f]{12}")
+
+
+def new_token() -> str:
+    return f"tn{secrets.token_hex(6)}"
+
+
+def note_text(note: dict[str, Any]) -> str:
+    return note.get("properties", {}).get("comments", [{}])[-1].get("text", "")
+
+
+def tokens_in(note: dict[str, Any]) -> list[str]:
+    """Tokens de todos los comentarios de la nota (varios si se fusionaron sesiones)."""
+    comments = note.get("properties", {}).get("comments", [])
+    return [token for comment in comments for token in TOKEN_PATTERN.findall(comment.get("text", ""))]
+
+
+def fetch_note(client: httpx.Client, note_id: Any) -> dict[str, Any]:
+    response = client.get(NOTE_PATH.format(note_id))
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_notes(client: httpx.Client) -> list[dict[str, Any]]:
+    response = client.get(NOTES_PATH)
+    response.raise_for_status()
+    return response.json().get("features", [])
+
+
+def find_note(notes: list[dict[str, Any]], token: str) -> dict[str, Any] | None:
+    """Busca desde la nota más reciente la que contiene `token`."""
+    for note in reversed(notes):
+        if token in note_text(note):
+            return note
+    return None
+
+
+def wait_for_note(
+    client: httpx.Client,
+    token: str,
+    timeout_seconds: float = 30.0,
+    poll_interval: float = 0.2,
+) -> tuple[dict[str, Any], float]:
+    """Espera la nota con `token`; devuelve la nota y el instante (`perf_counter`) en que se vio."""
+    deadline = time.perf_counter() + timeout_seconds
+    while True:
+        note = find_note(fetch_notes(client), token)
+        if note is not None:
+            return note, time.perf_counter()
+        if time.perf_counter() >= deadline:
+            raise TimeoutError(f"Timeout esperando la nota con token '{token}'")
+        time.sleep(poll_interval)
+
+
+class NoteWatcher:
+    """Sondea fake OSM en segundo plano y registra cuándo aparece cada token.
+
+    Pensado para cargas con muchas sesiones en vuelo, donde esperar nota por nota
+    con `wait_for_note` serializaría el generador.
+    """
+
+    def __init__(self, client: httpx.Client, poll_interval: float = 0.2) -> None:
+        self._client = client
+        self.poll_interval = poll_interval
+        self.seen_at: dict[str, float] = {}
+        self.note_tokens: dict[Any, list[str]] = {}
+        self.notes: dict[Any, dict[str, Any]] = {}
+        self.note_seen_at: dict[Any, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="note-watcher", daemon=True)
+
+    def start(self) -> "NoteWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def wait_for(self, tokens: set[str], timeout_seconds: float) -> set[str]:
+        """Espera a que aparezcan `tokens`; devuelve los que siguen pendientes."""
+        deadline = time.perf_counter() + timeout_seconds
+        while True:
+            with self._lock:
+                pending = tokens - self.seen_at.keys()
+            if not pending or time.perf_counter() >= deadline:
+                return pending
+            time.sleep(self.poll_interval)
+
+    def refresh(self) -> None:
+        """Vuelve a pedir por id cada nota vista, para juzgarla con sus comentarios y datos actuales."""
+        with self._lock:
+            note_ids = list(self.notes)
+        for note_id in note_ids:
+            try:
+                note = fetch_note(self._client, note_id)
+            except httpx.HTTPError:
+                continue
+            observed = time.perf_counter()
+            with self._lock:
+                self._record(note_id, note, observed)
+
+    def notes_for(self, token: str) -> list[dict[str, Any]]:
+        """Notas vistas cuyo texto contiene `token` (más de una indica duplicados)."""
+        with self._lock:
+            return [self.notes[note_id] for note_id, tokens in self.note_tokens.items() if token in tokens]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                notes = fetch_notes(self._client)
+            except httpx.HTTPError:
+                notes = []
+            observed = time.perf_counter()
+            with self._lock:
+                for note in notes:
+                    note_id = note.get("properties", {}).get("id")
+                    known = self.notes.get(note_id)
+                    # Una nota ya vista solo se vuelve a procesar si cambió su lista de comentarios.
+                    if known is not None and _comment_count(known) == _comment_count(note):
+                        continue
+                    self._record(note_id, note, observed)
+            self._stop.wait(self.poll_interval)
+
+    def _record(self, note_id: Any, note: dict[str, Any], observed: float) -> None:
+        tokens = tokens_in(note)
+        self.note_tokens[note_id] = tokens
+        self.notes[note_id] = note
+        self.note_seen_at.setdefault(note_id, observed)
+        for token in tokens:
+            self.seen_at.setdefault(token, observed)
+
+
+def _comment_count(note: dict[str, Any]) -> int:
+    return len(note.get("properties", {}).get("comments", []))
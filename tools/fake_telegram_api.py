@@ -0,0 +1,263 @@
+"""Emulador local de Telegram Bot API para adaptadores en modo long-polling.
+
+Encola updates (los mismos payloads de `scenarios/telegram/cases/scripts/`) y
+los sirve por `getUpdates` con la semántica de offset/limit/timeout de la API
+real. Registra cuándo se encoló, entregó y confirmó cada update para medir
+la tasa de drenado del adaptador.
+
+Uso independiente: `python -m tools.fake_telegram_api --port 8081`; los updates
+se encolan con `POST /__control__/updates` y las métricas se leen en
+`GET /__control__/stats`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+METHOD_PATH = re.compile(r"^/bot(?P<token>[^/]+)/(?P<method>[A-Za-z]+)$")
+MAX_LIMIT = 100
+
+
+@dataclass
+class PollRecord:
+    """Una llamada a `getUpdates`: se registra al llegar y se completa al responder."""
+
+    at: float
+    offset: int | None
+    limit: int
+    timeout: float
+    # `None` mientras el long-poll sigue abierto.
+    returned: int | None = None
+    returned_at: float | None = None
+
+
+@dataclass
+class BotAPIState:
+    """Estado compartido del emulador; los tiempos son `time.perf_counter()`."""
+
+    next_update_id: int = 1
+    pending: deque[dict[str, Any]] = field(default_factory=deque)
+    enqueued_at: dict[int, float] = field(default_factory=dict)
+    delivered_at: dict[int, float] = field(default_factory=dict)
+    confirmed_at: dict[int, float] = field(default_factory=dict)
+    polls: list[PollRecord] = field(default_factory=list)
+    sent_messages: list[dict[str, Any]] = field(default_factory=list)
+    webhook_url: str = ""
+    condition: threading.Condition = field(default_factory=threading.Condition)
+
+    def enqueue(self, update: dict[str, Any]) -> int:
+        """Encola una copia del update con un `update_id` creciente y lo devuelve."""
+        with self.condition:
+            update_id = self.next_update_id
+            self.next_update_id += 1
+            self.pending.append({**update, "update_id": update_id})
+            self.enqueued_at[update_id] = time.perf_counter()
+            self.condition.notify_all()
+            return update_id
+
+    def get_updates(self, offset: int | None, limit: int, timeout: float) -> list[dict[str, Any]]:
+        limit = max(1, min(limit, MAX_LIMIT))
+        arrived = time.perf_counter()
+        deadline = arrived + timeout
+        with self.condition:
+            poll = PollRecord(arrived, offset, limit, timeout)
+            self.polls.append(poll)
+            self.condition.notify_all()
+            self._confirm(offset)
+            while not self.pending and time.perf_counter() < deadline:
+                self.condition.wait(deadline - time.perf_counter())
+                self._confirm(offset)
+            batch = list(self.pending)[:limit]
+            now = time.perf_counter()
+            for update in batch:
+                self.delivered_at.setdefault(update["update_id"], now)
+            poll.returned, poll.returned_at = len(batch), now
+            return batch
+
+    def _confirm(self, offset: int | None) -> None:
+        """Descarta los updates que `offset` deja atrás, como la API real.
+
+        Con `offset` positivo se confirman los anteriores a él; con `offset`
+        negativo solo se conservan los últimos `-offset` y el resto se olvida.
+        """
+        if not offset:
+            return
+        now = time.perf_counter()
+        while self.pending and (
+            self.pending[0]["update_id"] < offset if offset > 0 else len(self.pending) > -offset
+        ):
+            update = self.pending.popleft()
+            self.confirmed_at[update["update_id"]] = now
+
+    def stats(self) -> dict[str, Any]:
+        with self.condition:
+            batches = [poll.returned for poll in self.polls if poll.returned is not None]
+            return {
+                "enqueued": len(self.enqueued_at),
+                "delivered": len(self.delivered_at),
+                "confirmed": len(self.confirmed_at),
+                "pending": len(self.pending),
+                "polls": len(batches),
+                "open_polls": len(self.polls) - len(batches),
+                "empty_polls": sum(1 for size in batches if size == 0),
+                "mean_batch": sum(batches) / len(batches) if batches else 0.0,
+                "max_batch": max(batches, default=0),
+                "sent_messages": len(self.sent_messages),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "BotAPIEmulator"
+
+    def do_GET(self) -> None:  # noqa: N802 - nombre impuesto por BaseHTTPRequestHandler
+        self._dispatch()
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch()
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        params: dict[str, Any] = dict(parse_qsl(url.query))
+        try:
+            params.update(self._read_body())
+        except ValueError:
+            return self._bad_request("can't parse request body as a JSON object")
+        state = self.server.state
+
+        if url.path == "/__control__/updates" and self.command == "POST":
+            updates = params.get("updates", [])
+            if not isinstance(updates, list) or not all(isinstance(update, dict) for update in updates):
+                return self._bad_request("`updates` debe ser una lista de objetos")
+            ids = [state.enqueue(update) for update in updates]
+            return self._reply(200, {"ok": True, "result": ids})
+        if url.path == "/__control__/stats":
+            return self._reply(200, {"ok": True, "result": state.stats()})
+
+        match = METHOD_PATH.match(url.path)
+        if match is None:
+            return self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+        if self.server.token and match["token"] != self.server.token:
+            return self._reply(401, {"ok": False, "error_code": 401, "description": "Unauthorized"})
+        if match["method"] == "getUpdates" and state.webhook_url:
+            return self._reply(409, {
+                "ok": False,
+                "error_code": 409,
+                "description": "Conflict: can't use getUpdates method while webhook is active",
+            })
+        try:
+            result = self._call(match["method"], params)
+        except (TypeError, ValueError) as exc:
+            # `int(None)` o `float([])` en un parámetro JSON mal tipado.
+            return self._bad_request(str(exc))
+        self._reply(200, {"ok": True, "result": result})
+
+    def _call(self, method: str, params: dict[str, Any]) -> Any:
+        state = self.server.state
+        if method == "getUpdates":
+            offset = int(params["offset"]) if "offset" in params else None
+            return state.get_updates(
+                offset,
+                int(params.get("limit", MAX_LIMIT)),
+                float(params.get("timeout", 0)),
+            )
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Terranote", "username": "terranote_test_bot"}
+        if method == "setWebhook":
+            state.webhook_url = params.get("url", "")
+            return True
+        if method == "deleteWebhook":
+            state.webhook_url = ""
+            return True
+        if method == "getWebhookInfo":
+            return {"url": state.webhook_url, "pending_update_count": len(state.pending)}
+        if method == "sendMessage":
+            with state.condition:
+                state.sent_messages.append(params)
+                message_id = len(state.sent_messages)
+            return {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id"), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        return True
+
+    def _read_body(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+        if "application/json" in (self.headers.get("Content-Type") or ""):
+            body = json.loads(raw or b"{}")
+            # La API real solo acepta objetos; `[]` o un escalar son un 400.
+            if not isinstance(body, dict):
+                raise ValueError(f"cuerpo JSON de tipo {type(body).__name__}")
+            return body
+        return dict(parse_qsl(raw.decode("utf-8")))
+
+    def _bad_request(self, detail: str) -> None:
+        self._reply(400, {"ok": False, "error_code": 400, "description": f"Bad Request: {detail}"})
+
+    def _reply(self, status: int, body: dict[str, Any]) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class BotAPIEmulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token: str = "") -> None:
+        super().__init__((host, port), _Handler)
+        self.state = BotAPIState()
+        self.token = token
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "BotAPIEmulator":
+        self._thread = threading.Thread(target=self.serve_forever, name="bot-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Emulador local de Telegram Bot API (getUpdates)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--token", default="", help="Si se indica, solo acepta /bot<token>/...")
+    args = parser.parse_args()
+    emulator = BotAPIEmulator(args.host, args.port, args.token)
+    print(f"Bot API emulada en {emulator.base_url}")
+    try:
+        emulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.server_close()
+
+
+if __name__ == "__main__":
+    main()
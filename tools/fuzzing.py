@@ -0,0 +1,267 @@
+"""Generación y reducción de webhooks para fuzzing de los adaptadores.
+
+Cada caso parte de un payload válido de `tools.payloads` y aplica mutaciones
+aleatorias: campos faltantes, tipos incorrectos, coordenadas extremas,
+arreglos enormes, timestamps en formatos raros, anidamiento profundo o JSON
+truncado. Los casos que fallan se reducen con `shrink` hasta un reproductor
+mínimo que siga fallando.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import random
+import re
+from typing import Any, Callable, Iterator
+
+from tools.payloads import ChannelSpec
+
+NodePath = tuple[Any, ...]
+
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+EXTREME_COORDINATES = [90.0000001, -90.0000001, 180.0000001, 1e308, -1e308, 0, -0.0, 1e-320, float("nan"), "4.711"]
+ODD_TIMESTAMPS = [
+    0,
+    -1,
+    1700000000,
+    1700000000000,
+    "1700000000",
+    "2024-02-30T25:61:61Z",
+    "2024-01-01T00:00:00",
+    "2024-01-01T00:00:00+14:00",
+    "Mon, 01 Jan 2024 00:00:00 GMT",
+    "",
+    "9999-12-31T23:59:59.999999999Z",
+]
+NESTING_SENTINEL = "__terranote_nesting__"
+NESTING_RUN = re.compile(rb"(\[{2,})0(\]{2,})")
+WRONG_TYPES = [None, True, 0, -1, "", "null", [], {}, 2**63, 1.5]
+
+
+def base_payload(channel: ChannelSpec, rng: random.Random) -> Any:
+    user_id = channel.user_id(rng.randrange(10**6))
+    if rng.random() < 0.5:
+        return channel.text_payload(user_id, "Vía cerrada", rng.randrange(10**6))
+    return channel.location_payload(user_id, 4.711, -74.0721, rng.randrange(10**6))
+
+
+def fuzz_payload(channel: ChannelSpec, rng: random.Random, max_mutations: int = 3) -> tuple[Any, list[str]]:
+    """Payload mutado y la lista de mutaciones aplicadas.
+
+    Las mutaciones estructurales se aplican primero; la de tamaño, si la hay, al
+    final y una sola vez, para que recorrer el payload siga siendo barato.
+    """
+    payload = base_payload(channel, rng)
+    inflate = rng.random() < 0.5
+    mutations = rng.choices(STRUCTURAL_MUTATIONS, k=rng.randint(0 if inflate else 1, max_mutations - inflate))
+    if inflate:
+        mutations.append(rng.choice(SIZE_MUTATIONS))
+    applied = []
+    for name, mutation in mutations:
+        payload = mutation(payload, rng)
+        applied.append(name)
+    return payload, applied
+
+
+def encode(value: Any) -> bytes:
+    """Cuerpo HTTP del caso; los valores `bytes` se envían tal cual (JSON inválido)."""
+    if isinstance(value, bytes):
+        return value
+    return json.dumps(value, ensure_ascii=False, allow_nan=True).encode("utf-8")
+
+
+# --- Mutaciones -------------------------------------------------------------
+
+
+def _paths(value: Any, prefix: NodePath = ()) -> Iterator[NodePath]:
+    """Rutas de todos los nodos, incluida la raíz."""
+    yield prefix
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _paths(child, (*prefix, key))
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from _paths(child, (*prefix, index))
+
+
+def _get(value: Any, path: NodePath) -> Any:
+    for part in path:
+        value = value[part]
+    return value
+
+
+def _replace(value: Any, path: NodePath, new: Any) -> Any:
+    if not path:
+        return new
+    result = copy.deepcopy(value)
+    parent = _get(result, path[:-1])
+    parent[path[-1]] = new
+    return result
+
+
+def _delete(value: Any, path: NodePath) -> Any:
+    result = copy.deepcopy(value)
+    parent = _get(result, path[:-1])
+    del parent[path[-1]]
+    return result
+
+
+def _paths_with_key(value: Any, keys: set[str]) -> list[NodePath]:
+    return [path for path in _paths(value) if path and path[-1] in keys]
+
+
+def _drop_field(payload: Any, rng: random.Random) -> Any:
+    paths = [path for path in _paths(payload) if path]
+    return _delete(payload, rng.choice(paths)) if paths else payload
+
+
+def _wrong_type(payload: Any, rng: random.Random) -> Any:
+    paths = [path for path in _paths(payload) if path]
+    return _replace(payload, rng.choice(paths), rng.choice(WRONG_TYPES)) if paths else payload
+
+
+def _extreme_coordinates(payload: Any, rng: random.Random) -> Any:
+    paths = _paths_with_key(payload, {"latitude", "longitude"})
+    for path in paths:
+        payload = _replace(payload, path, rng.choice(EXTREME_COORDINATES))
+    return payload
+
+
+def _odd_timestamp(payload: Any, rng: random.Random) -> Any:
+    paths = _paths_with_key(payload, {"timestamp", "date"})
+    return _replace(payload, rng.choice(paths), rng.choice(ODD_TIMESTAMPS)) if paths else payload
+
+
+def _huge_array(payload: Any, rng: random.Random) -> Any:
+    lists = [path for path in _paths(payload) if isinstance(_get(payload, path), list)]
+    if not lists:
+        return payload
+    path = rng.choice(lists)
+    items = _get(payload, path) or [{}]
+    item_size = len(encode(items))
+    rest = len(encode(payload)) - len(encode(_get(payload, path)))
+    return _replace(payload, path, items * rng.choice(_fitting_factors(rest, item_size, (100, 1000, 10000))))
+
+
+def _huge_string(payload: Any, rng: random.Random) -> Any:
+    strings = [path for path in _paths(payload) if path and isinstance(_get(payload, path), str)]
+    if not strings:
+        return payload
+    path = rng.choice(strings)
+    filler = rng.choice(["a", "🚧", "‮", "\\", "́", "\x00"])
+    # Lo que ocupa cada repetición ya serializada: "\x00" se escribe como `\u0000` (6 bytes).
+    filler_size = len(encode(filler)) - 2
+    rest = len(encode(payload)) - len(encode(_get(payload, path))) + 2
+    return _replace(payload, path, filler * rng.choice(_fitting_factors(rest, filler_size, (10**4, 10**5, 10**6))))
+
+
+def _fitting_factors(rest: int, unit: int, factors: tuple[int, ...]) -> list[int]:
+    """Factores con los que el cuerpo no pasa de `MAX_BODY_BYTES`; si ninguno cabe, el mayor posible."""
+    fitting = [factor for factor in factors if rest + unit * factor <= MAX_BODY_BYTES]
+    return fitting or [max((MAX_BODY_BYTES - rest) // unit, 1)]
+
+
+def _deep_nesting(payload: Any, rng: random.Random) -> Any:
+    """Sustituye un campo por listas anidadas; se serializa a mano por el límite de recursión."""
+    paths = [path for path in _paths(payload) if path]
+    if not paths:
+        return payload
+    depth = rng.choice([1000, 10000, 100000])
+    body = encode(_replace(payload, rng.choice(paths), NESTING_SENTINEL))
+    return body.replace(json.dumps(NESTING_SENTINEL).encode(), b"[" * depth + b"0" + b"]" * depth, 1)
+
+
+def _truncated_json(payload: Any, rng: random.Random) -> Any:
+    body = encode(payload)
+    return body[: rng.randrange(1, len(body))]
+
+
+Mutation = tuple[str, Callable[[Any, random.Random], Any]]
+
+STRUCTURAL_MUTATIONS: list[Mutation] = [
+    ("campo faltante", _drop_field),
+    ("tipo incorrecto", _wrong_type),
+    ("coordenadas extremas", _extreme_coordinates),
+    ("timestamp raro", _odd_timestamp),
+]
+SIZE_MUTATIONS: list[Mutation] = [
+    ("arreglo enorme", _huge_array),
+    ("texto enorme", _huge_string),
+    ("anidamiento profundo", _deep_nesting),
+    ("JSON truncado", _truncated_json),
+]
+
+
+# --- Reducción --------------------------------------------------------------
+
+
+def shrink_candidates(value: Any) -> Iterator[Any]:
+    """Variantes más pequeñas de `value`, de las más agresivas a las más finas.
+
+    Los cuerpos `bytes` no son JSON válido: solo se reduce la profundidad del
+    anidamiento y se truncan, así que el resto de su estructura no es mínimo.
+    """
+    if isinstance(value, bytes):
+        yield from _shallower(value)
+    if isinstance(value, (bytes, str)):
+        length = len(value)
+        for size in (length // 2, length * 3 // 4, length - 1):
+            if 0 <= size < length:
+                yield value[:size]
+        return
+    if isinstance(value, list):
+        if len(value) > 1:
+            yield value[: len(value) // 2]
+            yield value[:1]
+        for index in range(len(value)):
+            yield value[:index] + value[index + 1:]
+    elif isinstance(value, dict):
+        for key in value:
+            yield {k: v for k, v in value.items() if k != key}
+    elif isinstance(value, (int, float)) and not isinstance(value, bool) and value != 0:
+        yield 0
+        return
+    else:
+        return
+
+    # Reducciones dentro de cada hijo, conservando el resto de la estructura.
+    children = value.items() if isinstance(value, dict) else enumerate(value)
+    for key, child in children:
+        for smaller in shrink_candidates(child):
+            replaced = copy.copy(value)
+            replaced[key] = smaller
+            yield replaced
+
+
+def _shallower(body: bytes) -> Iterator[bytes]:
+    """El mismo cuerpo con el anidamiento de `_deep_nesting` a menor profundidad."""
+    for match in NESTING_RUN.finditer(body):
+        depth = len(match[1])
+        if len(match[2]) != depth:
+            continue
+        for size in (depth // 2, depth * 3 // 4, depth - 1):
+            if 0 < size < depth:
+                yield body[: match.start()] + b"[" * size + b"0" + b"]" * size + body[match.end():]
+        return
+
+
+def shrink(value: Any, still_fails: Callable[[Any], bool], max_attempts: int = 200) -> tuple[Any, int]:
+    """Reducción voraz: acepta la primera variante que sigue fallando y reinicia.
+
+    Devuelve el reproductor mínimo encontrado y el número de intentos usados.
+    """
+    attempts = 0
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        for candidate in shrink_candidates(value):
+            if attempts >= max_attempts:
+                break
+            attempts += 1
+            if still_fails(candidate):
+                value = candidate
+                improved = True
+                break
+    return value, attempts
@@ -1 +1,374 @@
+"""Cliente HTTP compartido por los escenarios E2E.
 
+Por defecto los escenarios hablan con los servicios por red. Con
+`TERRANOTE_TRANSPORT=asgi`, las peticiones dirigidas a `CORE_BASE_URL`,
+`ADAPTER_BASE_URL` y `FAKE_OSM_BASE_URL` se resuelven en el mismo proceso
+contra las aplicaciones ASGI indicadas en `CORE_ASGI_APP`, `ADAPTER_ASGI_APP`
+y `FAKE_OSM_ASGI_APP` (formato `paquete.modulo:atributo`). Las mismas
+variables con prefijo `A_` o `B_` enrutan los dos stacks de una comparación A/B;
+cada stack carga su propia copia de los módulos, así que no comparten estado.
+
+Solo se enrutan los clientes creados con `get_client()`. Las llamadas entre
+servicios (por ejemplo, el adaptador llamando al core) salen a la red, salvo
+que la aplicación reciba los transportes de `service_mounts()` por su propia
+configuración o desde un fixture.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import importlib
+import importlib.util
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Callable, Iterator
+
+import httpx
+
+from tools.metrics_stream import MetricsStream, get_stream
+
+DEFAULT_TIMEOUT = 10.0
+
+# Servicio -> (variable con la URL base, variable con la ruta de importación ASGI)
+SERVICES: dict[str, tuple[str, str]] = {
+    "core": ("CORE_BASE_URL", "CORE_ASGI_APP"),
+    "adapter": ("ADAPTER_BASE_URL", "ADAPTER_ASGI_APP"),
+    "fake_osm": ("FAKE_OSM_BASE_URL", "FAKE_OSM_ASGI_APP"),
+    # Escenarios multicanal con un adaptador por canal.
+    "telegram_adapter": ("TELEGRAM_ADAPTER_BASE_URL", "TELEGRAM_ADAPTER_ASGI_APP"),
+    "whatsapp_adapter": ("WHATSAPP_ADAPTER_BASE_URL", "WHATSAPP_ADAPTER_ASGI_APP"),
+}
+# Prefijos de las variables de cada stack: el principal y los de una comparación A/B.
+STACK_PREFIXES = ("", "A_", "B_")
+
+# Espera máxima al `lifespan.startup` de una aplicación.
+LIFESPAN_TIMEOUT = float(os.environ.get("TERRANOTE_ASGI_LIFESPAN_TIMEOUT", "30"))
+
+# Hilo del bucle que ejecuta las aplicaciones en proceso.
+ASGI_LOOP_THREAD = "asgi-loop"
+
+# Segmentos de ruta que son identificadores (numéricos o UUID, con extensión opcional).
+ID_SEGMENT = re.compile(
+    r"(?<=/)(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})(?=(?:\.[A-Za-z]+)?(?:/|$))"
+)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def transport_mode() -> str:
+    return os.environ.get("TERRANOTE_TRANSPORT", "network").strip().lower()
+
+
+def get_client(base_url: str, timeout: float = DEFAULT_TIMEOUT) -> httpx.Client:
+    """Crea un cliente para `base_url`, enrutado en proceso si el modo ASGI está activo.
+
+    Con `METRICS_STREAM` configurado, cada petición se registra en el flujo de métricas.
+    Solo se miden los clientes creados aquí: un `httpx.Client` o `httpx.AsyncClient`
+    construido a mano no pasa por `MeteredTransport`.
+    """
+    mounts = asgi_mounts()
+    stream = get_stream()
+    if stream is None:
+        return httpx.Client(base_url=base_url, timeout=timeout, mounts=mounts)
+    return httpx.Client(
+        base_url=base_url,
+        timeout=timeout,
+        transport=MeteredTransport(httpx.HTTPTransport(), stream),
+        mounts={pattern: MeteredTransport(transport, stream) for pattern, transport in mounts.items()},
+    )
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Registra cada petición en el flujo de métricas, también las que fallan en el transporte.
+
+    La latencia va desde el envío hasta leer el cuerpo completo de la respuesta;
+    un error de conexión, un timeout o un fallo al leer el cuerpo se registran
+    con el nombre de la excepción.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, stream: MetricsStream) -> None:
+        self._transport = transport
+        self._stream = stream
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        series = series_name(request)
+        started = time.perf_counter()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception as exc:
+            self._stream.observe(series, time.perf_counter() - started, error=type(exc).__name__)
+            raise
+        status = response.status_code
+
+        def finished(error: str) -> None:
+            self._stream.observe(
+                series,
+                time.perf_counter() - started,
+                error=error or (f"HTTP {status}" if status >= 500 else ""),
+                status=status,
+            )
+
+        if response.is_closed:
+            # El transporte ya entregó el cuerpo completo en memoria (p. ej. el transporte ASGI).
+            finished("")
+        else:
+            response.stream = _ObservedStream(response.stream, finished)  # type: ignore[arg-type]
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def series_name(request: httpx.Request) -> str:
+    """Serie `MÉTODO host/ruta` con los identificadores como `{id}`: una serie por endpoint, no por nota."""
+    return f"{request.method} {request.url.host}{ID_SEGMENT.sub('{id}', request.url.path)}"
+
+
+class _ObservedStream(httpx.SyncByteStream):
+    """Cuerpo de respuesta que avisa una sola vez cuando termina de leerse, falla o se cierra."""
+
+    def __init__(self, stream: Any, finished: Callable[[str], None]) -> None:
+        self._stream = stream
+        self._finished: Callable[[str], None] | None = finished
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            yield from self._stream
+        except Exception as exc:
+            self._finish(type(exc).__name__)
+            raise
+        self._finish("")
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._finish("")
+
+    def _finish(self, error: str) -> None:
+        if self._finished is not None:
+            finished, self._finished = self._finished, None
+            finished(error)
+
+
+@lru_cache(maxsize=None)
+def asgi_mounts() -> dict[str, httpx.BaseTransport]:
+    """Devuelve los `mounts` de httpx que apuntan a las aplicaciones ASGI configuradas."""
+    if transport_mode() != "asgi":
+        return {}
+
+    mounts: dict[str, httpx.BaseTransport] = {}
+    for prefix in STACK_PREFIXES:
+        for service, (url_var, app_var) in SERVICES.items():
+            import_path = os.environ.get(prefix + app_var)
+            if not import_path:
+                continue
+            base_url = os.environ.get(prefix + url_var)
+            if not base_url:
+                raise RuntimeError(
+                    f"{prefix}{app_var} está definido pero falta {prefix}{url_var} "
+                    f"para enrutar '{prefix}{service}' en proceso"
+                )
+            url = httpx.URL(base_url)
+            mounts[f"{url.scheme}://{url.netloc.decode('ascii')}"] = _transport_for(prefix, import_path)
+
+    if not mounts:
+        raise RuntimeError(
+            "TERRANOTE_TRANSPORT=asgi requiere al menos una de: "
+            + ", ".join(app_var for _, app_var in SERVICES.values())
+        )
+    return mounts
+
+
+def service_mounts() -> dict[str, httpx.AsyncBaseTransport]:
+    """`mounts` asíncronos hacia las mismas aplicaciones, para los `httpx.AsyncClient` de los servicios.
+
+    Deben usarse desde el bucle ASGI compartido, es decir, dentro de las propias aplicaciones.
+    """
+    return {
+        pattern: _AsyncASGIRoute(transport)
+        for pattern, transport in asgi_mounts().items()
+        if isinstance(transport, ASGIThreadTransport)
+    }
+
+
+@lru_cache(maxsize=None)
+def _transport_for(stack: str, import_path: str) -> "ASGIThreadTransport":
+    """Un transporte (y un `lifespan`) por aplicación y stack, aunque se monte en varias URLs."""
+    return ASGIThreadTransport(load_asgi_app(import_path, stack))
+
+
+def load_asgi_app(import_path: str, stack: str = "") -> Callable[..., Any]:
+    """Importa una aplicación ASGI a partir de `paquete.modulo:atributo`.
+
+    Con `stack` (`A_` o `B_`), el módulo se carga en una copia propia del stack:
+    dos stacks con la misma ruta no comparten aplicación ni estado global.
+    """
+    module_name, _, attribute = import_path.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Ruta ASGI inválida '{import_path}', se esperaba 'modulo:atributo'")
+    app: Any = _stack_module(stack, module_name) if stack else importlib.import_module(module_name)
+    for part in attribute.split("."):
+        app = getattr(app, part)
+    return app
+
+
+@lru_cache(maxsize=None)
+def _stack_module(stack: str, module_name: str) -> ModuleType:
+    """Copia del módulo para un stack; las aplicaciones del mismo módulo y stack la comparten."""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No se encontró el módulo '{module_name}' para el stack {stack.rstrip('_')}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Bucle de eventos compartido, en un hilo propio, para todas las aplicaciones."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name=ASGI_LOOP_THREAD, daemon=True).start()
+        return _loop
+
+
+class ASGIThreadTransport(httpx.BaseTransport):
+    """Transporte síncrono que ejecuta una aplicación ASGI en el bucle compartido.
+
+    Las aplicaciones viven durante todo el proceso (con su `lifespan` iniciado una
+    sola vez), de modo que las tareas en segundo plano, como los callbacks del core,
+    siguen corriendo entre peticiones.
+    """
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self._app = app
+        # Como un servidor real: una excepción de la aplicación se traduce en un 500.
+        self._transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        self._lifespan = _Lifespan(app)
+        atexit.register(self._shutdown)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if threading.current_thread().name == ASGI_LOOP_THREAD:
+            raise RuntimeError(
+                "Cliente httpx síncrono usado dentro del bucle ASGI: bloquearía el bucle; usar httpx.AsyncClient"
+            )
+        self._ensure_started(request)
+        request.read()
+        timeout = request.extensions.get("timeout", {}).get("read")
+        if timeout is None:
+            # Sin timeout de lectura, una aplicación colgada bloquearía el caso para siempre.
+            timeout = DEFAULT_TIMEOUT
+        future = asyncio.run_coroutine_threadsafe(self._dispatch(request), _event_loop())
+        try:
+            status_code, headers, content = future.result(timeout)
+        except TimeoutError as exc:
+            future.cancel()
+            raise httpx.ReadTimeout("Timeout esperando la aplicación ASGI", request=request) from exc
+        return httpx.Response(status_code, headers=headers, content=content, request=request)
+
+    async def _dispatch(self, request: httpx.Request) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        return response.status_code, response.headers.raw, content
+
+    def _ensure_started(self, request: httpx.Request) -> None:
+        """Arranca la aplicación una sola vez; si su arranque falló, cada petición falla al instante."""
+        try:
+            asyncio.run_coroutine_threadsafe(self._lifespan.ensure_started(), _event_loop()).result()
+        except Exception as exc:  # noqa: BLE001 - se reporta como servicio inalcanzable
+            raise httpx.ConnectError(f"La aplicación ASGI no arrancó: {exc}", request=request) from exc
+
+    def _shutdown(self) -> None:
+        if _loop is not None and _loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self._lifespan.shutdown(), _loop)
+            try:
+                future.result(5.0)
+            except Exception:  # noqa: BLE001 - el proceso ya está terminando
+                pass
+
+
+class _AsyncASGIRoute(httpx.AsyncBaseTransport):
+    """Ruta asíncrona hacia una aplicación en proceso, para los clientes que crean las propias aplicaciones."""
+
+    def __init__(self, owner: ASGIThreadTransport) -> None:
+        self._owner = owner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if asyncio.get_running_loop() is not _loop:
+            raise RuntimeError("Las llamadas en proceso entre servicios deben hacerse desde el bucle ASGI compartido")
+        try:
+            await self._owner._lifespan.ensure_started()
+        except Exception as exc:  # noqa: BLE001 - se reporta como servicio inalcanzable
+            raise httpx.ConnectError(f"La aplicación ASGI no arrancó: {exc}", request=request) from exc
+        return await self._owner._transport.handle_async_request(request)
+
+
+class _Lifespan:
+    """Implementación mínima del protocolo `lifespan` de ASGI."""
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self._app = app
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task[Any] | None = None
+        self._startup: asyncio.Task[None] | None = None
+        self._complete: dict[str, asyncio.Future[None]] = {}
+
+    async def ensure_started(self) -> None:
+        """Ejecuta `startup` una vez; las llamadas siguientes reciben el mismo resultado o error."""
+        if self._startup is None:
+            self._startup = asyncio.get_running_loop().create_task(self.startup())
+        await asyncio.shield(self._startup)
+
+    async def startup(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._complete = {"startup": loop.create_future(), "shutdown": loop.create_future()}
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        received = False
+
+        async def receive() -> dict[str, Any]:
+            nonlocal received
+            received = True
+            assert self._queue is not None
+            return await self._queue.get()
+
+        self._task = loop.create_task(self._app(scope, receive, self._send))
+        await self._queue.put({"type": "lifespan.startup"})
+        done, _ = await asyncio.wait(
+            {self._task, self._complete["startup"]},
+            timeout=LIFESPAN_TIMEOUT,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if self._complete["startup"].done():
+            self._complete["startup"].result()
+            return
+        if not done:
+            raise TimeoutError(f"lifespan.startup sin respuesta tras {LIFESPAN_TIMEOUT:g} s")
+        error = self._task.exception()
+        # Una aplicación que falla sin leer el mensaje no soporta `lifespan`; si lo leyó, falló su arranque.
+        if error is not None and received:
+            raise RuntimeError(f"Fallo en lifespan startup: {type(error).__name__}: {error}") from error
+
+    async def shutdown(self) -> None:
+        if self._task is None or self._task.done() or self._queue is None:
+            return
+        await self._queue.put({"type": "lifespan.shutdown"})
+        await asyncio.wait({self._task, self._complete["shutdown"]}, return_when=asyncio.FIRST_COMPLETED)
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        phase, _, outcome = message["type"].removeprefix("lifespan.").partition(".")
+        future = self._complete.get(phase)
+        if future is None or future.done():
+            return
+        if outcome == "failed":
+            future.set_exception(RuntimeError(message.get("message", f"Fallo en lifespan {phase}")))
+        else:
+            future.set_result(None)
@@ -0,0 +1,198 @@
+"""Generador de carga de lazo abierto para los benchmarks.
+
+Las llegadas se planifican de antemano (segundos desde el inicio) y se
+despachan a un pool de hilos en su instante programado, sin esperar a que
+terminen las anteriores. Las latencias se miden desde el instante programado
+para no ocultar la espera en cola del propio generador (omisión coordinada).
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from tools.metrics import LatencySummary
+from tools.metrics_stream import get_stream
+
+
+@dataclass(frozen=True)
+class Arrival:
+    at: float
+    stream: str
+    seq: int = 0
+
+
+@dataclass
+class SessionResult:
+    """Resultado de una sesión texto + ubicación (o de un solo envío)."""
+
+    stream: str
+    token: str
+    scheduled_at: float
+    ack_latency: float | None = None
+    error: str = ""
+    note_seen_at: float | None = None
+
+    @property
+    def e2e_latency(self) -> float | None:
+        if self.note_seen_at is None:
+            return None
+        return self.note_seen_at - self.scheduled_at
+
+
+def constant_rate(rate: float, duration: float) -> list[float]:
+    """Instantes de llegada a tasa fija (`rate` por segundo) durante `duration` segundos."""
+    if rate <= 0:
+        return []
+    interval = 1.0 / rate
+    return [i * interval for i in range(int(duration * rate))]
+
+
+def merge_streams(streams: dict[str, Iterable[float]]) -> list[Arrival]:
+    """Une las llegadas de varios flujos en una sola secuencia ordenada por tiempo."""
+    per_stream = (
+        [Arrival(at=at, stream=name, seq=seq) for seq, at in enumerate(times)]
+        for name, times in streams.items()
+    )
+    return list(heapq.merge(*per_stream, key=lambda arrival: arrival.at))
+
+
+def run_open_loop(
+    arrivals: list[Arrival],
+    task: Callable[[Arrival, float], SessionResult],
+    max_workers: int = 32,
+) -> tuple[list[SessionResult], float]:
+    """Despacha cada llegada en su instante; `task` recibe la llegada y su instante absoluto.
+
+    Devuelve los resultados y el instante (`perf_counter`) de inicio de la carga.
+    Con `METRICS_STREAM` configurado, cada sesión se registra al terminar en la
+    serie `session:<flujo>`.
+    """
+    stream = get_stream()
+    if stream is not None:
+        inner = task
+
+        def task(arrival: Arrival, scheduled_at: float) -> SessionResult:
+            result = inner(arrival, scheduled_at)
+            stream.observe(f"session:{result.stream}", result.ack_latency, result.error, token=result.token)
+            return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load") as pool:
+        futures = []
+        for arrival in arrivals:
+            scheduled_at = start + arrival.at
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(task, arrival, scheduled_at))
+        results = [future.result() for future in futures]
+    return results, start
+
+
+@dataclass
+class StreamSummary:
+    stream: str
+    sent: int
+    errors: int
+    notes: int
+    throughput: float
+    ack: LatencySummary
+    e2e: LatencySummary
+
+    @property
+    def lost(self) -> int:
+        return self.sent - self.errors - self.notes
+
+
+def summarize_stream(stream: str, results: list[SessionResult], start: float) -> StreamSummary:
+    acks = [r.ack_latency for r in results if r.ack_latency is not None and not r.error]
+    e2e = [r.e2e_latency for r in results if r.e2e_latency is not None]
+    seen = [r.note_seen_at for r in results if r.note_seen_at is not None]
+    window = max(seen) - start if seen else 0.0
+    return StreamSummary(
+        stream=stream,
+        sent=len(results),
+        errors=sum(1 for r in results if r.error),
+        notes=len(e2e),
+        throughput=len(e2e) / window if window > 0 else 0.0,
+        ack=LatencySummary.from_samples(acks),
+        e2e=LatencySummary.from_samples(e2e),
+    )
+
+
+def results_between(results: list[SessionResult], start: float, begin: float, end: float) -> list[SessionResult]:
+    """Sesiones programadas entre `begin` y `end` segundos desde el inicio de la carga."""
+    return [r for r in results if begin <= r.scheduled_at - start < end]
+
+
+def calm_baseline(
+    results: list[SessionResult], start: float, bursts: list[tuple[float, float]], horizon: float
+) -> float:
+    """p95 E2E en calma: sesiones fuera de las ráfagas y de los `horizon` segundos siguientes."""
+    calm = [
+        r
+        for r in results
+        if not any(begin <= r.scheduled_at - start < end + horizon for begin, end in bursts)
+    ]
+    if not any(r.e2e_latency is not None for r in calm):
+        calm = [r for r in results if not any(begin <= r.scheduled_at - start < end for begin, end in bursts)]
+    return summarize_stream("calma", calm, start).e2e.p95
+
+
+@dataclass
+class BurstRecovery:
+    begin: float
+    end: float
+    during: StreamSummary
+    after: StreamSummary
+    recovery: float | None
+
+    @property
+    def rate(self) -> float:
+        return self.during.sent / (self.end - self.begin) if self.end > self.begin else 0.0
+
+
+def burst_recovery(
+    results: list[SessionResult],
+    start: float,
+    bursts: list[tuple[float, float]],
+    baseline: float,
+    window: float,
+    tolerance: float,
+    horizon: float,
+) -> list[BurstRecovery]:
+    """Cómo se recupera el sistema tras cada ráfaga.
+
+    Tras el fin de la ráfaga se recorren ventanas de `window` segundos (hasta
+    `horizon` o la siguiente ráfaga); el tiempo de recuperación es el inicio
+    de la primera ventana sin notas perdidas y con p95 E2E dentro de
+    `baseline * (1 + tolerance)`. `None` si no se recupera en ese plazo.
+    """
+    recoveries = []
+    for index, (begin, end) in enumerate(bursts):
+        limit = end + horizon
+        if index + 1 < len(bursts):
+            limit = min(limit, bursts[index + 1][0])
+        recovery = None
+        offset = end
+        while offset < limit:
+            window_results = results_between(results, start, offset, min(offset + window, limit))
+            summary = summarize_stream("ventana", window_results, start)
+            if window_results and summary.lost == 0 and summary.e2e.p95 <= baseline * (1 + tolerance):
+                recovery = offset - end
+                break
+            offset += window
+        recoveries.append(
+            BurstRecovery(
+                begin=begin,
+                end=end,
+                during=summarize_stream("ráfaga", results_between(results, start, begin, end), start),
+                after=summarize_stream("después", results_between(results, start, end, limit), start),
+                recovery=recovery,
+            )
+        )
+    return recoveries
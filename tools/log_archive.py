@@ -0,0 +1,194 @@
+"""Archivo comprimido y de solo anexado para los registros de ejecución.
+
+En lugar de un archivo `.log` por ejecución, cada registro se anexa como un
+miembro gzip independiente al segmento actual (`segment-000001.gz`, ...). El
+segmento rota al superar `LOG_ARCHIVE_SEGMENT_MB`. Junto a cada segmento, un
+índice JSONL (`segment-000001.idx`) guarda el desplazamiento y la longitud de
+cada registro, así que leer una ejecución solo descomprime sus bytes. Los
+segmentos siguen siendo gzip válido (`zcat segment-000001.gz`).
+
+Lectura: `python -m tools.log_archive list` y
+`python -m tools.log_archive show <id>`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: sin bloqueo entre procesos
+    fcntl = None  # type: ignore[assignment]
+
+LOG_DIR = Path(os.environ.get("LOG_DIR", "./logs"))
+ARCHIVE_ENABLED = os.environ.get("LOG_ARCHIVE", "0") == "1"
+SEGMENT_BYTES = int(float(os.environ.get("LOG_ARCHIVE_SEGMENT_MB", "64")) * 1024 * 1024)
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{6})\.gz$")
+UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    run_id: str
+    segment: str
+    offset: int
+    length: int
+    size: int
+    created: str
+
+
+def run_id_for(filename: str) -> str:
+    """ID de ejecución a partir del nombre de log de los scripts, sin `:` ni extensión."""
+    return UNSAFE_ID_CHARS.sub("", Path(filename).stem.replace(":", ""))
+
+
+class LogArchive:
+    """Escritor y lector de un directorio de segmentos."""
+
+    def __init__(self, directory: Path, segment_bytes: int = SEGMENT_BYTES) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+
+    def append(self, run_id: str, content: str) -> str:
+        """Anexa el registro y devuelve su referencia `<segmento>#<id>`."""
+        data = content.encode("utf-8")
+        buffer = io.BytesIO()
+        # El nombre del registro queda en la cabecera gzip del miembro.
+        with gzip.GzipFile(filename=run_id, mode="wb", fileobj=buffer, mtime=int(time.time())) as member:
+            member.write(data)
+        compressed = buffer.getvalue()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            segment = self._current_segment()
+            with segment.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(compressed)
+            entry = IndexEntry(
+                run_id=run_id,
+                segment=segment.name,
+                offset=offset,
+                length=len(compressed),
+                size=len(data),
+                created=datetime.now().isoformat(timespec="seconds"),
+            )
+            line = json.dumps(asdict(entry)).encode("utf-8") + b"\n"
+            with segment.with_suffix(".idx").open("a+b") as index:
+                if index.tell():
+                    index.seek(-1, os.SEEK_END)
+                    if index.read(1) != b"\n":
+                        # Tras una línea cortada, la entrada nueva empieza en su propia línea.
+                        line = b"\n" + line
+                index.write(line)
+        return f"{segment}#{run_id}"
+
+    def entries(self) -> Iterator[IndexEntry]:
+        """Entradas de todos los índices, de la más antigua a la más reciente.
+
+        Una línea cortada (por ejemplo, si el proceso murió mientras escribía) se
+        omite con un aviso en lugar de impedir leer el resto de ejecuciones.
+        """
+        for index_path in sorted(self.directory.glob("segment-*.idx")):
+            with index_path.open(encoding="utf-8", errors="replace") as index:
+                for number, line in enumerate(index, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = IndexEntry(**json.loads(line))
+                    except (TypeError, ValueError):
+                        print(f"⚠️ {index_path.name}:{number}: entrada ilegible, se omite", file=sys.stderr)
+                        continue
+                    yield entry
+
+    def find(self, run_id: str) -> IndexEntry | None:
+        """Entrada más reciente con ese ID (acepta también una referencia `<segmento>#<id>`)."""
+        run_id = run_id.rsplit("#", 1)[-1]
+        found = None
+        for entry in self.entries():
+            if entry.run_id == run_id:
+                found = entry
+        return found
+
+    def read(self, entry: IndexEntry) -> str:
+        with (self.directory / entry.segment).open("rb") as segment:
+            segment.seek(entry.offset)
+            compressed = segment.read(entry.length)
+        return gzip.decompress(compressed).decode("utf-8")
+
+    def _current_segment(self) -> Path:
+        numbers = [
+            int(match.group(1))
+            for path in self.directory.iterdir()
+            if (match := SEGMENT_PATTERN.match(path.name))
+        ]
+        number = max(numbers, default=1)
+        segment = self.directory / f"segment-{number:06d}.gz"
+        if segment.exists() and segment.stat().st_size >= self.segment_bytes:
+            segment = self.directory / f"segment-{number + 1:06d}.gz"
+        return segment
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Bloqueo exclusivo entre procesos mientras se anexa."""
+        with (self.directory / ".lock").open("a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_run_log(filename: str, content: str, log_dir: Path = LOG_DIR) -> str:
+    """Guarda el registro de una ejecución y devuelve dónde quedó.
+
+    Con `LOG_ARCHIVE=1` se anexa al archivo `<log_dir>/archive`; si no, se
+    escribe `<log_dir>/<filename>` como siempre.
+    """
+    if ARCHIVE_ENABLED:
+        return LogArchive(log_dir / "archive").append(run_id_for(filename), content)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    output_path = log_dir / filename
+    output_path.write_text(content, encoding="utf-8")
+    return str(output_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lectura del archivo de registros de ejecución")
+    parser.add_argument("--dir", type=Path, default=LOG_DIR / "archive", help="Directorio del archivo")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="Lista las ejecuciones archivadas")
+    list_parser.add_argument("--prefix", default="", help="Solo IDs que empiezan así (p. ej. telegram_)")
+    list_parser.add_argument("--limit", type=int, default=50, help="Últimas N ejecuciones (0 = todas)")
+    show_parser = commands.add_parser("show", help="Imprime el registro de una ejecución")
+    show_parser.add_argument("run_id", help="ID de la ejecución o referencia <segmento>#<id>")
+    args = parser.parse_args()
+
+    archive = LogArchive(args.dir)
+    if args.command == "list":
+        entries = [entry for entry in archive.entries() if entry.run_id.startswith(args.prefix)]
+        for entry in entries[-args.limit:] if args.limit else entries:
+            print(f"{entry.created}  {entry.segment}  {entry.size:>8} B  {entry.run_id}")
+        return
+
+    entry = archive.find(args.run_id)
+    if entry is None:
+        sys.exit(f"No se encontró la ejecución {args.run_id} en {args.dir}")
+    sys.stdout.write(archive.read(entry))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Estadísticas de latencia compartidas por los benchmarks."""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Percentil `q` (0-100) con interpolación lineal; `nan` si no hay muestras."""
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+@dataclass
+class LatencySummary:
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    maximum: float
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float]) -> "LatencySummary":
+        if not samples:
+            return cls(0, math.nan, math.nan, math.nan, math.nan, math.nan)
+        ordered = sorted(samples)
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=percentile(ordered, 50),
+            p95=percentile(ordered, 95),
+            p99=percentile(ordered, 99),
+            maximum=ordered[-1],
+        )
+
+
+def format_ms(seconds: float) -> str:
+    if math.isnan(seconds):
+        return "-"
+    return f"{seconds * 1000:.1f}"
+
+
+@dataclass
+class Comparison:
+    """Diferencia `B - A` de un estadístico con su intervalo de confianza bootstrap."""
+
+    a: float
+    b: float
+    delta: float
+    low: float
+    high: float
+
+    @property
+    def relative(self) -> float:
+        return self.delta / self.a if self.a else math.nan
+
+    @property
+    def significant(self) -> bool:
+        """El intervalo excluye el cero."""
+        return self.low > 0 or self.high < 0
+
+
+def bootstrap_delta(
+    a_blocks: Sequence[Sequence[float]],
+    b_blocks: Sequence[Sequence[float]],
+    statistic: Callable[[Sequence[float]], float],
+    rng: random.Random,
+    iterations: int = 2000,
+    confidence: float = 0.95,
+) -> tuple[float, float, float]:
+    """`statistic(b) - statistic(a)` e intervalo percentil con bootstrap por bloques.
+
+    Se remuestrean bloques completos (p. ej. rondas), no muestras sueltas, para
+    conservar la correlación entre las muestras de un mismo bloque. Con el mismo
+    número de bloques en ambos grupos se toman los mismos índices en los dos
+    (bloques emparejados).
+    """
+    a, b = _flatten(a_blocks), _flatten(b_blocks)
+    if not a or not b:
+        return math.nan, math.nan, math.nan
+    paired = len(a_blocks) == len(b_blocks)
+    deltas = []
+    for _ in range(iterations):
+        a_indexes = rng.choices(range(len(a_blocks)), k=len(a_blocks))
+        b_indexes = a_indexes if paired else rng.choices(range(len(b_blocks)), k=len(b_blocks))
+        a_sample = [value for index in a_indexes for value in a_blocks[index]]
+        b_sample = [value for index in b_indexes for value in b_blocks[index]]
+        if a_sample and b_sample:
+            deltas.append(statistic(b_sample) - statistic(a_sample))
+    deltas.sort()
+    tail = (1 - confidence) / 2 * 100
+    return statistic(b) - statistic(a), percentile(deltas, tail), percentile(deltas, 100 - tail)
+
+
+def _flatten(blocks: Sequence[Sequence[float]]) -> list[float]:
+    return [value for block in blocks for value in block]
+
+
+def mann_whitney(a: Sequence[float], b: Sequence[float]) -> tuple[float, float]:
+    """Prueba U de Mann-Whitney bilateral (aproximación normal con corrección por empates).
+
+    Devuelve `U` de `b` y el valor p; `nan` si algún grupo está vacío o todo es empate.
+    """
+    n_a, n_b = len(a), len(b)
+    if not n_a or not n_b:
+        return math.nan, math.nan
+    ranked = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    rank_sum_b = 0.0
+    tie_term = 0.0
+    index = 0
+    while index < len(ranked):
+        end = index
+        while end + 1 < len(ranked) and ranked[end + 1][0] == ranked[index][0]:
+            end += 1
+        average_rank = (index + end) / 2 + 1
+        rank_sum_b += average_rank * sum(group for _, group in ranked[index:end + 1])
+        ties = end - index + 1
+        tie_term += ties**3 - ties
+        index = end + 1
+    u_b = rank_sum_b - n_b * (n_b + 1) / 2
+    n = n_a + n_b
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u_b, math.nan
+    z = (abs(u_b - n_a * n_b / 2) - 0.5) / math.sqrt(variance)
+    return u_b, math.erfc(max(z, 0.0) / math.sqrt(2))
+
+
+def compare_samples(
+    a_blocks: Sequence[Sequence[float]],
+    b_blocks: Sequence[Sequence[float]],
+    statistic: Callable[[Sequence[float]], float],
+    rng: random.Random,
+    iterations: int = 2000,
+    confidence: float = 0.95,
+) -> Comparison:
+    """Compara un estadístico de dos grupos divididos en bloques (ver `bootstrap_delta`)."""
+    a, b = _flatten(a_blocks), _flatten(b_blocks)
+    delta, low, high = bootstrap_delta(a_blocks, b_blocks, statistic, rng, iterations, confidence)
+    return Comparison(
+        a=statistic(a) if a else math.nan,
+        b=statistic(b) if b else math.nan,
+        delta=delta,
+        low=low,
+        high=high,
+    )
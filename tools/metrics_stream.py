@@ -0,0 +1,208 @@
+"""Flujo de métricas en JSON lines para seguir una ejecución en vivo.
+
+Con `METRICS_STREAM` configurado, el runner, los clientes HTTP y el generador
+de carga emiten un registro JSON por línea mientras la ejecución avanza:
+
+- `request`: cada petición HTTP o sesión (serie, latencia, estado, error).
+- `window`: cada `METRICS_STREAM_WINDOW` segundos, por serie: peticiones,
+  errores, throughput y percentiles de la ventana.
+- eventos del runner (`run_start`, `readiness`, `case_start`, `case_end`,
+  `run_end`).
+
+Destinos: `-` (stdout), una ruta de archivo (se anexa), `tcp://host:puerto` o
+`unix:///ruta/al/socket`. `emit` solo encola: un hilo escribe por lotes y, si
+el destino no acepta datos o el búfer se llena, los registros se descartan y
+se cuentan en `dropped` en lugar de frenar al generador.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, TextIO
+from urllib.parse import urlparse
+
+from tools.metrics import percentile
+
+METRICS_STREAM = os.environ.get("METRICS_STREAM", "")
+WINDOW_SECONDS = float(os.environ.get("METRICS_STREAM_WINDOW", "5"))
+# Con 0 solo se emiten las ventanas y los eventos, no cada petición.
+PER_REQUEST = os.environ.get("METRICS_STREAM_REQUESTS", "1") == "1"
+MAX_BUFFER = int(os.environ.get("METRICS_STREAM_BUFFER", "100000"))
+FLUSH_SECONDS = 0.2
+SOCKET_TIMEOUT_SECONDS = 1.0
+RECONNECT_SECONDS = 2.0
+
+
+class MetricsStream:
+    """Registros JSON lines con escritura diferida en un hilo propio."""
+
+    def __init__(
+        self,
+        target: str,
+        window_seconds: float = WINDOW_SECONDS,
+        per_request: bool = PER_REQUEST,
+        max_buffer: int = MAX_BUFFER,
+    ) -> None:
+        self.target = target
+        self.window_seconds = window_seconds
+        self.per_request = per_request
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: deque[dict[str, Any]] = deque()
+        self._window: dict[str, list[tuple[float, bool]]] = {}
+        self._window_started = time.time()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._sink: TextIO | socket.socket | None = None
+        self._next_connect = 0.0
+        # Una escritura falló a medias: el próximo lote empieza con un salto de línea.
+        self._partial = False
+        self._thread = threading.Thread(target=self._run, name="metrics-stream", daemon=True)
+
+    def start(self) -> "MetricsStream":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Cierra la ventana en curso, vacía el búfer y libera el destino."""
+        if self._stop.is_set() or not self._thread.is_alive():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def emit(self, record_type: str, **fields: Any) -> None:
+        """Encola un registro; nunca bloquea por el destino."""
+        record = {"ts": round(time.time(), 6), "type": record_type, **fields}
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(record)
+
+    def observe(self, series: str, latency: float | None, error: str = "", **fields: Any) -> None:
+        """Registra una petición o sesión para su ventana y, si corresponde, como registro propio."""
+        failed = bool(error)
+        with self._lock:
+            self._window.setdefault(series, []).append((latency if latency is not None else -1.0, failed))
+        if self.per_request:
+            self.emit(
+                "request",
+                series=series,
+                latency_ms=None if latency is None else round(latency * 1000, 3),
+                error=error or None,
+                **fields,
+            )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(FLUSH_SECONDS)
+            self._wake.clear()
+            if time.time() - self._window_started >= self.window_seconds:
+                self._close_window()
+            self._flush()
+        self._close_window()
+        self._flush()
+        if self.dropped:
+            self._write([{"ts": round(time.time(), 6), "type": "dropped", "count": self.dropped}])
+        if self._sink is not None and self._sink not in (sys.stdout, sys.stderr):
+            self._sink.close()
+
+    def _close_window(self) -> None:
+        now = time.time()
+        with self._lock:
+            window, self._window = self._window, {}
+            started, self._window_started = self._window_started, now
+        elapsed = max(now - started, 1e-9)
+        for series, samples in window.items():
+            latencies = [latency for latency, failed in samples if not failed and latency >= 0]
+            self.emit(
+                "window",
+                series=series,
+                start=round(started, 6),
+                seconds=round(elapsed, 3),
+                requests=len(samples),
+                errors=sum(1 for _, failed in samples if failed),
+                throughput=round(len(samples) / elapsed, 3),
+                p50_ms=_ms(percentile(latencies, 50)),
+                p95_ms=_ms(percentile(latencies, 95)),
+                p99_ms=_ms(percentile(latencies, 99)),
+                max_ms=_ms(max(latencies)) if latencies else None,
+            )
+
+    def _flush(self) -> None:
+        with self._lock:
+            records, self._buffer = list(self._buffer), deque()
+        if records and not self._write(records):
+            with self._lock:
+                self.dropped += len(records)
+
+    def _write(self, records: list[dict[str, Any]]) -> bool:
+        sink = self._connect()
+        if sink is None:
+            return False
+        data = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+        if self._partial:
+            # Cierra la línea que quedó a medias para que el siguiente registro se lea entero.
+            data = "\n" + data
+        try:
+            if isinstance(sink, socket.socket):
+                sink.sendall(data.encode("utf-8"))
+            else:
+                sink.write(data)
+                sink.flush()
+        except OSError:
+            self._partial = True
+            if isinstance(sink, socket.socket):
+                # La conexión se descarta: el consumidor ve el cierre justo después de la línea incompleta.
+                sink.close()
+                self._sink = None
+                self._next_connect = time.monotonic() + RECONNECT_SECONDS
+            return False
+        self._partial = False
+        return True
+
+    def _connect(self) -> TextIO | socket.socket | None:
+        if self._sink is not None or time.monotonic() < self._next_connect:
+            return self._sink
+        url = urlparse(self.target)
+        try:
+            if self.target == "-":
+                self._sink = sys.stdout
+            elif url.scheme == "tcp":
+                self._sink = socket.create_connection((url.hostname, url.port), SOCKET_TIMEOUT_SECONDS)
+            elif url.scheme == "unix":
+                sink = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sink.settimeout(SOCKET_TIMEOUT_SECONDS)
+                sink.connect(url.path)
+                self._sink = sink
+            else:
+                self._sink = open(self.target, "a", encoding="utf-8")  # noqa: SIM115 - se cierra en `_run`
+        except OSError:
+            # Sin consumidor escuchando: se reintenta más tarde sin frenar la ejecución.
+            self._next_connect = time.monotonic() + RECONNECT_SECONDS
+        return self._sink
+
+
+def _ms(seconds: float) -> float | None:
+    return None if math.isnan(seconds) else round(seconds * 1000, 3)
+
+
+@lru_cache(maxsize=None)
+def get_stream() -> MetricsStream | None:
+    """Flujo compartido configurado con `METRICS_STREAM`, o `None` si está desactivado."""
+    if not METRICS_STREAM:
+        return None
+    stream = MetricsStream(METRICS_STREAM).start()
+    atexit.register(stream.close)
+    return stream
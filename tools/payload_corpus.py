@@ -0,0 +1,174 @@
+"""Corpus de webhooks pre-serializados para los generadores de carga.
+
+Cada forma de webhook (canal × texto/ubicación × mensaje) se serializa una
+sola vez a una plantilla de bytes con huecos con nombre para los campos
+variables: IDs, timestamps, usuario, token de correlación y coordenadas.
+Generar un webhook es un único formateo `%` sobre la plantilla y su
+codificación a UTF-8, sin construir diccionarios anidados ni llamar a
+`json.dumps`.
+
+Los cuerpos se envían con `content=` y `JSON_HEADERS`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator
+
+from tools.correlation import new_token
+from tools.payloads import ChannelSpec
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+DEFAULT_MESSAGE = "Vía cerrada por obras."
+SLOT_MARKER = "@@slot:{}@@"
+
+NodePath = tuple[Any, ...]
+# (ruta en el payload, o None si el marcador ya está en un texto; nombre; conversión `%`)
+# Conversiones: "d" entero, "r" float, "s" texto que no necesita escape JSON (dígitos, hex, ISO 8601).
+SlotSpec = tuple["NodePath | None", str, str]
+
+TELEGRAM_MESSAGE = ("message",)
+WHATSAPP_MESSAGE = ("entry", 0, "changes", 0, "value", "messages", 0)
+
+
+class PayloadTemplate:
+    """Cuerpo JSON serializado con huecos que se rellenan en cada `render`."""
+
+    def __init__(self, payload: Any, slots: list[SlotSpec]) -> None:
+        for path, name, _ in slots:
+            if path is None:
+                continue
+            parent = payload
+            for part in path[:-1]:
+                parent = parent[part]
+            parent[path[-1]] = SLOT_MARKER.format(name)
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        markers = {}
+        for path, name, conversion in slots:
+            marker = SLOT_MARKER.format(name)
+            # Un número que sustituye a un valor completo se serializó como cadena:
+            # el hueco incluye las comillas.
+            if path is not None and conversion != "s":
+                marker = json.dumps(marker)
+            markers[marker] = f"%({name}){conversion}"
+        pattern = re.compile("|".join(re.escape(marker) for marker in markers))
+
+        parts = []
+        position = 0
+        for match in pattern.finditer(body):
+            parts.append(body[position:match.start()].replace("%", "%%"))
+            parts.append(markers[match.group()])
+            position = match.end()
+        parts.append(body[position:].replace("%", "%%"))
+        self.template = "".join(parts)
+
+    def render(self, values: dict[str, Any]) -> bytes:
+        return (self.template % values).encode("utf-8")
+
+
+class _Clock:
+    """Timestamps del segundo actual, recalculados solo cuando cambia el segundo."""
+
+    def __init__(self) -> None:
+        self._second = -1
+        self._iso = ""
+
+    def now(self) -> tuple[int, str]:
+        """Segundo actual como timestamp Unix y como ISO 8601 en UTC."""
+        second = int(time.time())
+        if second != self._second:
+            self._second = second
+            self._iso = datetime.fromtimestamp(second, tz=timezone.utc).isoformat()
+        return second, self._iso
+
+
+class PayloadCorpus:
+    """Webhooks de texto y ubicación de un canal, renderizados desde plantillas."""
+
+    def __init__(self, channel: ChannelSpec) -> None:
+        self.channel = channel
+        self._templates: dict[tuple[str, str], PayloadTemplate] = {}
+        self._clock = _Clock()
+
+    def text(self, user_index: int, token: str, seq: int, message: str = DEFAULT_MESSAGE) -> bytes:
+        """Texto `"<token> <message>"`; hay una plantilla por cada `message` distinto."""
+        values = self._common(user_index, seq)
+        values["token"] = token
+        return self._template("text", message).render(values)
+
+    def location(self, user_index: int, latitude: float, longitude: float, seq: int) -> bytes:
+        values = self._common(user_index, seq)
+        values["latitude"] = round(latitude, 7)
+        values["longitude"] = round(longitude, 7)
+        return self._template("location", "").render(values)
+
+    def sessions(
+        self,
+        coordinates: Iterable[tuple[float, float]],
+        first_user: int = 0,
+        message: str = DEFAULT_MESSAGE,
+    ) -> Iterator[tuple[str, bytes, bytes]]:
+        """Sesiones `(token, texto, ubicación)` bajo demanda, un usuario nuevo por coordenada."""
+        for offset, (latitude, longitude) in enumerate(coordinates):
+            user_index = first_user + offset
+            token = new_token()
+            yield (
+                token,
+                self.text(user_index, token, 2 * user_index, message),
+                self.location(user_index, latitude, longitude, 2 * user_index + 1),
+            )
+
+    def _common(self, user_index: int, seq: int) -> dict[str, Any]:
+        unix, iso = self._clock.now()
+        user_id = self.channel.user_id(user_index)
+        if self.channel.name == "telegram":
+            return {"update_id": 100000000 + seq, "message_id": seq, "date": unix, "user": int(user_id)}
+        return {"user": user_id, "message_id": seq, "timestamp": iso}
+
+    def _template(self, kind: str, message: str) -> PayloadTemplate:
+        key = (kind, message)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = self._build(kind, message)
+        return template
+
+    def _build(self, kind: str, message: str) -> PayloadTemplate:
+        sample_user = self.channel.user_id(0)
+        if kind == "text":
+            # El token va al inicio del texto; el resto del mensaje queda fijo.
+            payload = self.channel.text_payload(sample_user, f"{SLOT_MARKER.format('token')} {message}", 0)
+        else:
+            payload = self.channel.location_payload(sample_user, 0.0, 0.0, 0)
+
+        if self.channel.name == "telegram":
+            root = TELEGRAM_MESSAGE
+            slots: list[SlotSpec] = [
+                (("update_id",), "update_id", "d"),
+                ((*root, "message_id"), "message_id", "d"),
+                ((*root, "date"), "date", "d"),
+                ((*root, "from", "id"), "user", "d"),
+                ((*root, "chat", "id"), "user", "d"),
+            ]
+        else:
+            root = WHATSAPP_MESSAGE
+            payload_message = payload
+            for part in root:
+                payload_message = payload_message[part]
+            # El ID de mensaje conserva el prefijo de los payloads de `tools.payloads`.
+            payload_message["id"] = f"wamid.bench{SLOT_MARKER.format('message_id')}"
+            slots = [
+                ((*root, "from"), "user", "s"),
+                (None, "message_id", "d"),
+                ((*root, "timestamp"), "timestamp", "s"),
+            ]
+
+        if kind == "text":
+            slots.append((None, "token", "s"))
+        else:
+            slots.append(((*root, "location", "latitude"), "latitude", "r"))
+            slots.append(((*root, "location", "longitude"), "longitude", "r"))
+        return PayloadTemplate(payload, slots)
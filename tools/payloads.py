@@ -0,0 +1,130 @@
+"""Constructores de webhooks de Telegram y WhatsApp para benchmarks y cargas.
+
+Reproducen la forma de los payloads usados en `scenarios/<canal>/cases/scripts/`
+para que los benchmarks no tengan que copiar los diccionarios anidados.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+Payload = dict[str, Any]
+
+
+def utf16_length(text: str) -> int:
+    """Longitud en unidades UTF-16, la que usa Telegram para sus límites de texto."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def telegram_text_update(user_id: str, text: str, seq: int) -> Payload:
+    return _telegram_update(user_id, seq, {"text": text})
+
+
+def telegram_location_update(user_id: str, latitude: float, longitude: float, seq: int) -> Payload:
+    return _telegram_update(user_id, seq, {"location": {"latitude": latitude, "longitude": longitude}})
+
+
+def _telegram_update(user_id: str, seq: int, content: Payload) -> Payload:
+    return {
+        "update_id": 100000000 + seq,
+        "message": {
+            "message_id": seq,
+            "date": int(datetime.now(tz=timezone.utc).timestamp()),
+            "from": {
+                "id": int(user_id),
+                "is_bot": False,
+                "first_name": "Test",
+                "username": "testuser",
+            },
+            "chat": {"id": int(user_id), "type": "private"},
+            **content,
+        },
+    }
+
+
+def whatsapp_text_event(msisdn: str, text: str, seq: int) -> Payload:
+    return _whatsapp_event(msisdn, seq, {"type": "text", "text": {"body": text}})
+
+
+def whatsapp_location_event(msisdn: str, latitude: float, longitude: float, seq: int) -> Payload:
+    return _whatsapp_event(
+        msisdn,
+        seq,
+        {"type": "location", "location": {"latitude": latitude, "longitude": longitude}},
+    )
+
+
+def _whatsapp_event(msisdn: str, seq: int, content: Payload) -> Payload:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": "wa_e2e",
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "metadata": {
+                                "display_phone_number": "1555000000",
+                                "phone_number_id": "phone-test",
+                            },
+                            "contacts": [],
+                            "messages": [
+                                {
+                                    "from": msisdn,
+                                    "id": f"wamid.bench{seq}",
+                                    "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+                                    **content,
+                                }
+                            ],
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+@dataclass(frozen=True)
+class ChannelSpec:
+    name: str
+    webhook_path: str
+    default_adapter_url: str
+    max_text_length: int
+    user_id: Callable[[int], str]
+    text_payload: Callable[[str, str, int], Payload]
+    location_payload: Callable[[str, float, float, int], Payload]
+    # Cómo cuenta la plataforma la longitud del texto frente a `max_text_length`.
+    text_length: Callable[[str], int] = len
+
+    @property
+    def adapter_url(self) -> str:
+        """URL del adaptador del canal (`<CANAL>_ADAPTER_BASE_URL` o el valor por defecto)."""
+        return os.environ.get(f"{self.name.upper()}_ADAPTER_BASE_URL", self.default_adapter_url)
+
+
+CHANNELS: dict[str, ChannelSpec] = {
+    "telegram": ChannelSpec(
+        name="telegram",
+        webhook_path="/telegram/webhook",
+        default_adapter_url="http://localhost:3000",
+        max_text_length=4096,
+        user_id=lambda index: str(123000000 + index),
+        text_payload=telegram_text_update,
+        location_payload=telegram_location_update,
+        text_length=utf16_length,
+    ),
+    "whatsapp": ChannelSpec(
+        name="whatsapp",
+        webhook_path="/webhook",
+        default_adapter_url="http://localhost:8001",
+        max_text_length=4096,
+        user_id=lambda index: f"5730{index:08d}",
+        text_payload=whatsapp_text_event,
+        location_payload=whatsapp_location_event,
+    ),
+}
@@ -0,0 +1,300 @@
+"""Perfilado del propio harness durante la ejecución de los casos.
+
+Sirve para descartar que la latencia medida se vaya en nuestro Python
+(creación de clientes, decodificación de listas de eventos, comparaciones
+cuadráticas) y no en los servicios. Por caso registra:
+
+- CPU del proceso frente a la duración del caso (sobrecarga del harness):
+  incluye los hilos que abra el caso, como los trabajadores de los
+  generadores de carga. En modo ASGI se descuenta el hilo del bucle donde
+  corren las aplicaciones, y siempre el del muestreador.
+- Puntos calientes de CPU, con `cProfile` (`cpu`, exacto pero más intrusivo)
+  o con un muestreador de pilas (`sample`, barato; cuenta tiempo de pared).
+- Opcionalmente, las líneas que más memoria retienen y el pico, con
+  `tracemalloc`.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Iterator
+
+from tools.http_client import ASGI_LOOP_THREAD
+
+MODES = ("cpu", "sample")
+PROFILES_DIR = Path("reports/runner/profiles")
+SAMPLER_THREAD = "profile-sampler"
+ROOT = Path(__file__).resolve().parent.parent
+STDLIB = sysconfig.get_paths()["stdlib"]
+
+
+@dataclass
+class HotSpot:
+    location: str
+    # Con `sample` no hay recuento de llamadas ni tiempo acumulado.
+    calls: int | None
+    seconds: float
+    cumulative: float | None = None
+
+
+@dataclass
+class AllocationSite:
+    location: str
+    size: int
+    count: int
+
+
+@dataclass
+class CaseProfile:
+    label: str
+    mode: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    hot_spots: list[HotSpot] = field(default_factory=list)
+    allocations: list[AllocationSite] = field(default_factory=list)
+    peak_memory: int | None = None
+    profile_path: Path | None = None
+
+    @property
+    def overhead(self) -> float:
+        """Fracción de la duración del caso que el harness pasó en CPU."""
+        return self.cpu / self.wall if self.wall > 0 else 0.0
+
+
+class StackSampler:
+    """Muestrea la pila de un hilo cada `interval` segundos y cuenta la función en ejecución."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=SAMPLER_THREAD, daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_frame_location(frame)] += 1
+                self.total += 1
+
+
+class HarnessProfiler:
+    """Perfila cada caso con `profile(label)` y acumula los resultados en `profiles`."""
+
+    def __init__(
+        self,
+        mode: str = "cpu",
+        memory: bool = False,
+        top: int = 10,
+        interval: float = 0.005,
+        output_dir: Path = PROFILES_DIR,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Modo de perfilado desconocido '{mode}' ({', '.join(MODES)})")
+        self.mode = mode
+        self.memory = memory
+        self.top = top
+        self.interval = interval
+        self.output_dir = output_dir
+        self.profiles: list[CaseProfile] = []
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[CaseProfile]:
+        result = CaseProfile(label=label, mode=self.mode)
+        profiler = cProfile.Profile() if self.mode == "cpu" else None
+        sampler = StackSampler(threading.get_ident(), self.interval) if self.mode == "sample" else None
+        if self.memory:
+            tracemalloc.start(1)
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+
+        started, cpu_started = time.perf_counter(), harness_cpu_time()
+        if profiler:
+            profiler.enable()
+        if sampler:
+            sampler.start()
+        try:
+            yield result
+        finally:
+            if profiler:
+                profiler.disable()
+            # Antes de detener el muestreador, para poder descontar su hilo.
+            result.wall = time.perf_counter() - started
+            result.cpu = harness_cpu_time() - cpu_started
+            if sampler:
+                sampler.stop()
+            # La instantánea va antes de procesar el perfil para no contar su memoria.
+            if self.memory:
+                after = tracemalloc.take_snapshot()
+                result.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                result.allocations = self._allocations(before, after)
+
+            if profiler:
+                result.hot_spots = self._hot_spots_from_profile(profiler)
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                result.profile_path = self.output_dir / f"{_slug(label)}_{timestamp}.prof"
+                profiler.dump_stats(result.profile_path)
+            if sampler:
+                result.hot_spots = [
+                    HotSpot(location=location, calls=None, seconds=count * sampler.interval)
+                    for location, count in sampler.samples.most_common(self.top)
+                ]
+            self.profiles.append(result)
+
+    def alerts(self, threshold: float) -> list[CaseProfile]:
+        """Casos cuya sobrecarga del harness supera `threshold` (fracción de la duración)."""
+        return [profile for profile in self.profiles if profile.overhead > threshold]
+
+    def report_tables(self, threshold: float) -> list[tuple[str, list[str], list[list[object]]]]:
+        """Tablas `(subtítulo, cabeceras, filas)` para adjuntar al reporte del runner."""
+        summary = [
+            [
+                profile.label,
+                profile.mode,
+                f"{profile.wall:.2f}",
+                f"{profile.cpu:.3f}",
+                f"{profile.overhead:.1%}",
+                "-" if profile.peak_memory is None else f"{profile.peak_memory / 1024:.0f}",
+                profile.profile_path or "-",
+                f"⚠️ > {threshold:.0%}" if profile.overhead > threshold else "",
+            ]
+            for profile in self.profiles
+        ]
+        tables = [
+            (
+                "Perfil del harness",
+                [
+                    "Caso",
+                    "Modo",
+                    "Duración (s)",
+                    "CPU harness (s)",
+                    "Sobrecarga",
+                    "Pico de memoria (KiB)",
+                    "Perfil",
+                    "Alerta",
+                ],
+                summary,
+            ),
+            (
+                "Puntos calientes de CPU" if self.mode == "cpu" else "Puntos calientes (muestreo, tiempo de pared)",
+                ["Caso", "Función", "Llamadas", "Propio (ms)", "Acumulado (ms)"],
+                [
+                    [
+                        profile.label,
+                        spot.location,
+                        "-" if spot.calls is None else spot.calls,
+                        f"{spot.seconds * 1000:.1f}",
+                        "-" if spot.cumulative is None else f"{spot.cumulative * 1000:.1f}",
+                    ]
+                    for profile in self.profiles
+                    for spot in profile.hot_spots
+                ],
+            ),
+        ]
+        if self.memory:
+            tables.append(
+                (
+                    "Memoria retenida por línea",
+                    ["Caso", "Línea", "KiB", "Bloques"],
+                    [
+                        [profile.label, site.location, f"{site.size / 1024:.1f}", site.count]
+                        for profile in self.profiles
+                        for site in profile.allocations
+                    ],
+                )
+            )
+        return tables
+
+    def _hot_spots_from_profile(self, profiler: cProfile.Profile) -> list[HotSpot]:
+        stats = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+        ordered = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            HotSpot(
+                location=_location(filename, line, function),
+                calls=calls,
+                seconds=own,
+                cumulative=cumulative,
+            )
+            for (filename, line, function), (_, calls, own, cumulative, _) in ordered[: self.top]
+        ]
+
+    def _allocations(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> list[AllocationSite]:
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+        differences = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        differences.sort(key=lambda stat: stat.size_diff, reverse=True)
+        return [
+            AllocationSite(
+                location=_location(stat.traceback[0].filename, stat.traceback[0].lineno),
+                size=stat.size_diff,
+                count=stat.count_diff,
+            )
+            for stat in differences[: self.top]
+            if stat.size_diff > 0
+        ]
+
+
+def harness_cpu_time() -> float:
+    """CPU de todos los hilos del proceso salvo el bucle ASGI y el muestreador."""
+    cpu = time.process_time()
+    for thread in threading.enumerate():
+        if thread.name in (ASGI_LOOP_THREAD, SAMPLER_THREAD) and thread.ident is not None:
+            try:
+                cpu -= time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+            except (AttributeError, OSError):
+                pass  # Sin relojes por hilo (p. ej. Windows): se cuenta todo el proceso.
+    return cpu
+
+
+def _frame_location(frame: FrameType) -> str:
+    code = frame.f_code
+    return _location(code.co_filename, frame.f_lineno, code.co_name)
+
+
+def _location(filename: str, line: int, function: str = "") -> str:
+    """`ruta:línea(función)` relativa al repositorio, a `site-packages` o a la biblioteca estándar."""
+    if filename == "~":
+        # Funciones integradas en cProfile.
+        return function
+    path = filename
+    if filename.startswith(str(ROOT)):
+        path = str(Path(filename).relative_to(ROOT))
+    elif "site-packages" in filename:
+        path = filename.split("site-packages", 1)[1].lstrip("/\\")
+    elif filename.startswith(STDLIB):
+        path = filename[len(STDLIB):].lstrip("/\\")
+    location = f"{path}:{line}" if line else path
+    return f"{location}({function})" if function else location
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")
@@ -0,0 +1,146 @@
+"""Sondeo de disponibilidad del stack antes de ejecutar casos.
+
+Cada servicio se sondea en su propio hilo con backoff exponencial y jitter
+completo; los casos esperan solo a los servicios de los que dependen (el runner
+toma primero los casos cuyos servicios ya respondieron) y el tiempo hasta
+quedar disponible se registra como métrica de arranque en frío.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Hashable, Iterable, Iterator, Mapping, TypeVar
+
+import httpx
+
+from tools.http_client import get_client
+
+K = TypeVar("K", bound=Hashable)
+
+DEFAULT_HEALTH_PATHS = {
+    "core": "/health",
+    "adapter": "/health",
+    "fake_osm": "/__control__/events",
+}
+
+
+@dataclass(frozen=True)
+class ServiceProbe:
+    name: str
+    base_url: str
+    health_path: str = "/health"
+
+    @classmethod
+    def for_service(cls, name: str, base_url: str) -> "ServiceProbe":
+        """Crea la sonda usando `<SERVICIO>_HEALTH_PATH` o la ruta por defecto."""
+        path = os.environ.get(f"{name.upper()}_HEALTH_PATH", DEFAULT_HEALTH_PATHS.get(name, "/health"))
+        return cls(name=name, base_url=base_url, health_path=path)
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.base_url})"
+
+
+@dataclass
+class ReadinessResult:
+    probe: ServiceProbe
+    ready: bool = False
+    elapsed_seconds: float = 0.0
+    attempts: int = 0
+    error: str = ""
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def describe(self) -> str:
+        if self.ready:
+            return f"listo en {self.elapsed_seconds:.2f} s tras {self.attempts} intento(s)"
+        return f"no disponible tras {self.elapsed_seconds:.2f} s ({self.attempts} intentos): {self.error}"
+
+
+def backoff_delays(
+    initial: float = 0.1,
+    maximum: float = 5.0,
+    factor: float = 2.0,
+    rng: random.Random | None = None,
+) -> Iterator[float]:
+    """Genera esperas con backoff exponencial y jitter completo."""
+    rng = rng or random.Random()
+    ceiling = initial
+    while True:
+        yield rng.uniform(0, ceiling)
+        ceiling = min(maximum, ceiling * factor)
+
+
+class ReadinessMonitor:
+    """Sondea varios servicios en paralelo y permite esperar a un subconjunto."""
+
+    def __init__(
+        self,
+        probes: Iterable[ServiceProbe],
+        timeout_seconds: float = 120.0,
+        request_timeout: float = 2.0,
+        max_delay: float = 5.0,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.request_timeout = request_timeout
+        self.max_delay = max_delay
+        self.results: dict[ServiceProbe, ReadinessResult] = {
+            probe: ReadinessResult(probe=probe) for probe in dict.fromkeys(probes)
+        }
+        self._started_at: float | None = None
+        self._changed = threading.Condition()
+
+    def start(self) -> "ReadinessMonitor":
+        self._started_at = time.perf_counter()
+        for result in self.results.values():
+            threading.Thread(
+                target=self._probe,
+                args=(result,),
+                name=f"ready-{result.probe.name}",
+                daemon=True,
+            ).start()
+        return self
+
+    def wait_for(self, probes: Iterable[ServiceProbe]) -> list[ReadinessResult]:
+        """Bloquea hasta que cada sonda indicada esté lista o haya agotado su plazo."""
+        waited = [self.results[probe] for probe in probes]
+        for result in waited:
+            result.done.wait()
+        return waited
+
+    def wait_any(self, groups: Mapping[K, Iterable[ServiceProbe]]) -> K:
+        """Bloquea hasta que algún grupo tenga todas sus sondas resueltas; devuelve el primero en orden."""
+        groups = {key: list(probes) for key, probes in groups.items()}
+        with self._changed:
+            while True:
+                for key, probes in groups.items():
+                    if all(self.results[probe].done.is_set() for probe in probes):
+                        return key
+                self._changed.wait()
+
+    def _probe(self, result: ReadinessResult) -> None:
+        assert self._started_at is not None
+        deadline = self._started_at + self.timeout_seconds
+        delays = backoff_delays(maximum=self.max_delay)
+        with get_client(result.probe.base_url, timeout=self.request_timeout) as client:
+            while True:
+                result.attempts += 1
+                try:
+                    response = client.get(result.probe.health_path)
+                    if response.is_success:
+                        result.ready = True
+                        break
+                    result.error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as exc:
+                    result.error = f"{type(exc).__name__}: {exc}"
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                time.sleep(min(next(delays), remaining))
+        result.elapsed_seconds = time.perf_counter() - self._started_at
+        with self._changed:
+            result.done.set()
+            self._changed.notify_all()
@@ -0,0 +1,113 @@
+"""Registro de casos de los escenarios, cacheado por fecha de modificación.
+
+Descubre los scripts de `scenarios/<canal>/cases/scripts/` sin importarlos:
+la descripción y las URLs de servicios se leen del código fuente. Los
+`test_*.py` son casos funcionales (`case`); el resto (`bench_*.py`,
+`fuzz_webhooks.py`, `load_traffic_shapes.py`, ...) son benchmarks (`bench`). El resultado
+se guarda en `reports/.cache/registry.json` y solo se recalcula cuando cambia
+algún script, así que listar o filtrar casos no importa `httpx` ni ejecuta
+nada de los scripts.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS_DIR = ROOT / "scenarios"
+CASE_GLOB = "*/cases/scripts/*.py"
+CASE_PREFIX = "test_"
+KINDS = ("case", "bench")
+# Sin `--kind`, solo los casos funcionales: los benchmarks tardan y se piden explícitamente.
+DEFAULT_KINDS = ("case",)
+DEFAULT_REGISTRY_PATH = ROOT / "reports/.cache/registry.json"
+URL_VAR_PATTERN = re.compile(r"^([A-Z][A-Z_]*_BASE_URL)\s*=", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Case:
+    channel: str
+    name: str
+    path: Path
+    description: str = ""
+    url_vars: tuple[str, ...] = ()
+    kind: str = "case"
+
+    @property
+    def label(self) -> str:
+        return f"{self.channel}/{self.name}"
+
+
+def _describe(path: Path) -> Case:
+    source = path.read_text(encoding="utf-8")
+    docstring = ast.get_docstring(ast.parse(source)) or ""
+    return Case(
+        channel=path.parents[2].name,
+        name=path.stem.removeprefix(CASE_PREFIX),
+        path=path,
+        description=docstring.strip().splitlines()[0] if docstring.strip() else "",
+        url_vars=tuple(URL_VAR_PATTERN.findall(source)),
+        kind="case" if path.stem.startswith(CASE_PREFIX) else "bench",
+    )
+
+
+def load_registry(registry_path: Path = DEFAULT_REGISTRY_PATH) -> list[Case]:
+    """Todos los casos; reutiliza el registro en disco si ningún script cambió."""
+    scripts = sorted(path for path in SCENARIOS_DIR.glob(CASE_GLOB) if not path.name.startswith("_"))
+    stamps = {str(path.relative_to(ROOT)): path.stat().st_mtime_ns for path in scripts}
+    try:
+        cached = json.loads(registry_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = {}
+    if cached.get("stamps") == stamps:
+        return [
+            Case(
+                channel=entry["channel"],
+                name=entry["name"],
+                path=ROOT / entry["path"],
+                description=entry["description"],
+                url_vars=tuple(entry["url_vars"]),
+                kind=entry.get("kind", "case"),
+            )
+            for entry in cached["cases"]
+        ]
+
+    cases = [_describe(path) for path in scripts]
+    payload = {
+        "stamps": stamps,
+        "cases": [
+            {
+                "channel": case.channel,
+                "name": case.name,
+                "path": str(case.path.relative_to(ROOT)),
+                "description": case.description,
+                "url_vars": list(case.url_vars),
+                "kind": case.kind,
+            }
+            for case in cases
+        ],
+    }
+    try:
+        registry_path.parent.mkdir(parents=True, exist_ok=True)
+        registry_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass  # Sin permisos de escritura: el registro se recalcula la próxima vez.
+    return cases
+
+
+def discover_cases(
+    channels: list[str] | None = None,
+    names: list[str] | None = None,
+    kinds: list[str] | None = None,
+) -> list[Case]:
+    """Casos del registro filtrados por canal, nombre y tipo (por defecto, `DEFAULT_KINDS`)."""
+    kinds = kinds or list(DEFAULT_KINDS)
+    return [
+        case
+        for case in load_registry()
+        if case.kind in kinds and (not channels or case.channel in channels) and (not names or case.name in names)
+    ]
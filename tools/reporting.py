@@ -5,7 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Sequence
 
 
 @dataclass
@@ -19,7 +19,9 @@ def build_markdown_report(
     case_results: Iterable[CaseResult],
     output_dir: Path,
     filename_prefix: str = "report",
+    extra_tables: Iterable[tuple[str, Sequence[str], Iterable[Sequence[object]]]] = (),
 ) -> Path:
+    """Reporte de casos; `extra_tables` agrega tablas `(subtítulo, cabeceras, filas)` al final."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / f"{filename_prefix}_{timestamp}.md"
@@ -33,7 +35,56 @@ def build_markdown_report(
     for result in case_results:
         details = result.details.replace("\n", "<br>")
         lines.append(f"| {result.name} | {result.status} | {details} |")
+    for subtitle, headers, rows in extra_tables:
+        lines.extend(["", f"## {subtitle}", "", *_table_lines(headers, rows)])
 
+    return _write_report(lines, output_path)
+
+
+def build_table_report(
+    title: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    output_dir: Path,
+    filename_prefix: str = "report",
+    notes: Iterable[str] = (),
+    extra_tables: Iterable[tuple[str, Sequence[str], Iterable[Sequence[object]]]] = (),
+) -> Path:
+    """Reporte con una tabla arbitraria, pensado para resultados de benchmarks.
+
+    `extra_tables` agrega tablas `(subtítulo, cabeceras, filas)` después de la principal.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"{filename_prefix}_{timestamp}.md"
+
+    note_lines = [f"- {note}" for note in notes]
+    lines = [
+        f"# {title} – {timestamp}",
+        "",
+        *note_lines,
+        *([""] if note_lines else []),
+        *_table_lines(headers, rows),
+    ]
+    for subtitle, extra_headers, extra_rows in extra_tables:
+        lines.extend(["", f"## {subtitle}", "", *_table_lines(extra_headers, extra_rows)])
+
+    return _write_report(lines, output_path)
+
+
+def _table_lines(headers: Sequence[str], rows: Iterable[Sequence[object]]) -> list[str]:
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "| " + " | ".join("---" for _ in headers) + " |",
+    ]
+    for row in rows:
+        cells = [str(cell).replace("\n", "<br>").replace("|", "\\|") for cell in row]
+        lines.append("| " + " | ".join(cells) + " |")
+    return lines
+
+
+def _write_report(lines: list[str], output_path: Path) -> Path:
+    output_dir = output_path.parent
     output_path.write_text("\n".join(lines), encoding="utf-8")
     latest_path = output_dir / "latest.md"
     latest_path.write_text("\n".join(lines), encoding="utf-8")
@@ -0,0 +1,107 @@
+"""Caché de resultados de casos indexada por las versiones desplegadas.
+
+La clave combina el contenido del script del caso y de las fuentes de
+`tools/` que usa, sus entradas (variables `TEST_*`, URLs de servicios y el
+modo de transporte con sus aplicaciones ASGI) y la versión de cada servicio
+del que depende.
+Si ninguna cambió desde una ejecución exitosa, el runner reutiliza ese
+resultado en lugar de volver a ejecutar el caso.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from tools.http_client import get_client, transport_mode
+from tools.readiness import ServiceProbe
+
+TOOLS_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_PATH = TOOLS_DIR.parent / "reports/.cache/results.json"
+UNKNOWN_VERSION = "unknown"
+VERSION_KEYS = ("version", "commit", "git_sha", "revision", "build")
+
+
+def service_version(probe: ServiceProbe) -> str:
+    """Versión de un servicio: `<SERVICIO>_VERSION` o el campo de versión de su health endpoint."""
+    prefix = probe.name.upper()
+    override = os.environ.get(f"{prefix}_VERSION")
+    if override:
+        return override
+
+    path = os.environ.get(f"{prefix}_VERSION_PATH", "/health")
+    try:
+        with get_client(probe.base_url, timeout=2.0) as client:
+            response = client.get(path)
+            response.raise_for_status()
+            body: Any = response.json()
+    except (httpx.HTTPError, ValueError):
+        return UNKNOWN_VERSION
+    if isinstance(body, dict):
+        found = [f"{key}={body[key]}" for key in VERSION_KEYS if body.get(key)]
+        if found:
+            return ",".join(found)
+    return UNKNOWN_VERSION
+
+
+@lru_cache(maxsize=None)
+def tools_sha256() -> str:
+    """Huella de las fuentes de `tools/`: un cambio en el harness invalida la caché."""
+    digest = hashlib.sha256()
+    for source in sorted(TOOLS_DIR.glob("*.py")):
+        digest.update(source.name.encode("utf-8"))
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def _is_input(name: str, url_vars: list[str]) -> bool:
+    # `TERRANOTE_*` incluye el modo de transporte; `*_ASGI_APP`, las aplicaciones en proceso.
+    return name.startswith(("TEST_", "TERRANOTE_")) or name.endswith("_ASGI_APP") or name in url_vars
+
+
+def cache_key(script: Path, versions: dict[str, str], url_vars: list[str]) -> str | None:
+    """Clave del caso, o `None` si alguna versión es desconocida (no se puede cachear)."""
+    if not versions or UNKNOWN_VERSION in versions.values():
+        return None
+    inputs = {name: value for name, value in sorted(os.environ.items()) if _is_input(name, url_vars)}
+    material = {
+        "script": script.name,
+        "script_sha256": hashlib.sha256(script.read_bytes()).hexdigest(),
+        "tools_sha256": tools_sha256(),
+        "transport": transport_mode(),
+        "inputs": inputs,
+        "versions": dict(sorted(versions.items())),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH) -> None:
+        self.path = path
+        self._entries: dict[str, dict[str, str]] = {}
+        if path.exists():
+            self._entries = json.loads(path.read_text(encoding="utf-8"))
+
+    def lookup(self, key: str | None) -> dict[str, str] | None:
+        if key is None:
+            return None
+        return self._entries.get(key)
+
+    def store(self, key: str | None, case: str, details: str) -> None:
+        """Guarda un resultado exitoso; los fallos nunca se cachean."""
+        if key is None:
+            return
+        self._entries[key] = {
+            "case": case,
+            "details": details,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._entries, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,241 @@
+"""Ejecuta los casos de los escenarios en cuanto sus servicios están disponibles.
+
+Uso: `python -m tools run [--channel telegram] [--case text_location] [--kind bench]`
+(equivalente a `python -m tools.runner ...`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.http_client import SERVICES  # noqa: E402
+from tools.metrics_stream import get_stream  # noqa: E402
+from tools.payloads import CHANNELS  # noqa: E402
+from tools.profiling import MODES, HarnessProfiler  # noqa: E402
+from tools.readiness import ReadinessMonitor, ServiceProbe  # noqa: E402
+from tools.registry import KINDS, Case, discover_cases  # noqa: E402
+from tools.reporting import CaseResult, build_markdown_report  # noqa: E402
+from tools.result_cache import ResultCache, cache_key, service_version  # noqa: E402
+
+REPORTS_DIR = Path("reports/runner")
+
+
+def load_case(case: Case) -> ModuleType:
+    module_name = f"terranote_case_{case.channel}_{case.name}"
+    spec = importlib.util.spec_from_file_location(module_name, case.path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No se pudo cargar {case.path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def case_dependencies(module: ModuleType) -> list[ServiceProbe]:
+    """Servicios de los que depende un caso.
+
+    Son las URLs base que declara el script (`*_BASE_URL`) y los adaptadores de los
+    canales listados en `ADAPTER_CHANNELS`, con la URL de su `ChannelSpec`.
+    """
+    probes = [
+        ServiceProbe.for_service(service, getattr(module, url_var))
+        for service, (url_var, _) in SERVICES.items()
+        if getattr(module, url_var, None)
+    ]
+    for name in getattr(module, "ADAPTER_CHANNELS", ()):
+        if name in CHANNELS:
+            probes.append(ServiceProbe.for_service(f"{name}_adapter", CHANNELS[name].adapter_url))
+    return probes
+
+
+def run_cases(
+    cases: list[Case],
+    ready_timeout: float = 120.0,
+    force: bool = False,
+    profiler: HarnessProfiler | None = None,
+) -> list[CaseResult]:
+    modules = {case: load_case(case) for case in cases}
+    dependencies = {case: case_dependencies(module) for case, module in modules.items()}
+    monitor = ReadinessMonitor(
+        (probe for probes in dependencies.values() for probe in probes),
+        timeout_seconds=ready_timeout,
+    ).start()
+    cache = ResultCache()
+    versions: dict[ServiceProbe, str] = {}
+    stream = get_stream()
+
+    # Los casos se toman en orden de disponibilidad: uno cuyos servicios ya
+    # respondieron no espera detrás de otro que aguarda a un servicio lento.
+    outcomes: dict[Case, CaseResult] = {}
+    pending = dict(modules)
+    while pending:
+        case = monitor.wait_any({case: dependencies[case] for case in pending})
+        module = pending.pop(case)
+        readiness = monitor.wait_for(dependencies[case])
+        if stream:
+            for result in readiness:
+                stream.emit("readiness", service=result.probe.label, ready=result.ready, details=result.describe())
+        missing = [result for result in readiness if not result.ready]
+        if missing:
+            details = "; ".join(f"{r.probe.label}: {r.describe()}" for r in missing)
+            outcomes[case] = CaseResult(name=case.label, status="OMITIDO", details=details)
+            if stream:
+                stream.emit("case_end", case=case.label, status="OMITIDO", details=details)
+            continue
+
+        for probe in dependencies[case]:
+            if probe not in versions:
+                versions[probe] = service_version(probe)
+        # Un benchmark vale por su medición: nunca se sirve desde la caché.
+        key = None if case.kind == "bench" else cache_key(
+            case.path,
+            {probe.label: versions[probe] for probe in dependencies[case]},
+            [SERVICES[probe.name][0] for probe in dependencies[case]],
+        )
+        cached = None if force else cache.lookup(key)
+        if cached is not None:
+            print(f"↺ {case.label} (sin cambios desde {cached['recorded_at']})")
+            outcomes[case] = CaseResult(name=case.label, status="OK", details=f"en caché desde {cached['recorded_at']}")
+            if stream:
+                stream.emit("case_end", case=case.label, status="OK", cached=True)
+            continue
+
+        print(f"▶ {case.label}")
+        if stream:
+            stream.emit("case_start", case=case.label)
+        started = time.perf_counter()
+        try:
+            if profiler:
+                with profiler.profile(case.label):
+                    module.main()
+            else:
+                module.main()
+        except SystemExit as exc:
+            # Los benchmarks terminan con `SystemExit(mensaje)` cuando fallan.
+            status, details = ("OK", "") if exc.code in (None, 0) else ("FALLO", f"SystemExit: {exc.code}")
+        except Exception as exc:  # noqa: BLE001 - el fallo se registra en el reporte
+            status, details = "FALLO", f"{type(exc).__name__}: {exc}"
+        else:
+            status, details = "OK", ""
+        elapsed = time.perf_counter() - started
+        details = f"{elapsed:.2f} s {details}".strip()
+        if status == "OK":
+            cache.store(key, case.label, details)
+        if stream:
+            stream.observe(f"case:{case.label}", elapsed, "" if status == "OK" else details)
+            stream.emit("case_end", case=case.label, status=status, seconds=round(elapsed, 3), details=details)
+        outcomes[case] = CaseResult(name=case.label, status=status, details=details)
+
+    readiness_results = [
+        CaseResult(
+            name=f"Disponibilidad {result.probe.label}",
+            status="OK" if result.ready else "FALLO",
+            details=result.describe(),
+        )
+        for result in monitor.results.values()
+    ]
+    # El reporte conserva el orden de descubrimiento.
+    return readiness_results + [outcomes[case] for case in cases]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channel", action="append", help="Canal a ejecutar (repetible)")
+    parser.add_argument("--case", action="append", help="Caso a ejecutar, p. ej. text_location (repetible)")
+    parser.add_argument(
+        "--kind", action="append", choices=KINDS, help="Tipo: case (por defecto) o bench (repetible)"
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=120.0,
+        help="Segundos máximos de espera por servicio antes de omitir sus casos",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=os.environ.get("TERRANOTE_FORCE_RERUN") == "1",
+        help="Ignora la caché de resultados y ejecuta todos los casos",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=MODES,
+        default=os.environ.get("TERRANOTE_PROFILE") or None,
+        help="Perfila el harness en cada caso ejecutado: cProfile (cpu) o muestreo de pilas (sample)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        default=os.environ.get("TERRANOTE_PROFILE_MEMORY") == "1",
+        help="Agrega instantáneas de tracemalloc al perfil",
+    )
+    parser.add_argument(
+        "--profile-alert",
+        type=float,
+        default=float(os.environ.get("TERRANOTE_PROFILE_ALERT", "0.1")),
+        help="Fracción de la duración de un caso en CPU del harness a partir de la cual se alerta",
+    )
+    parser.add_argument("--profile-top", type=int, default=10, help="Funciones y líneas por caso en el perfil")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # `choices` no valida el valor por defecto tomado de TERRANOTE_PROFILE.
+    if args.profile is not None and args.profile not in MODES:
+        parser.error(f"TERRANOTE_PROFILE={args.profile!r} no es válido (opciones: {', '.join(MODES)})")
+    cases = discover_cases(args.channel, args.case, args.kind)
+    if not cases:
+        print("No se encontraron casos con esos filtros.")
+        return 1
+
+    stream = get_stream()
+    if stream:
+        stream.emit("run_start", cases=[case.label for case in cases])
+    profiler = None
+    if args.profile or args.profile_memory:
+        profiler = HarnessProfiler(args.profile or "cpu", memory=args.profile_memory, top=args.profile_top)
+    results = run_cases(cases, ready_timeout=args.ready_timeout, force=args.force, profiler=profiler)
+    report_path = build_markdown_report(
+        results,
+        output_dir=REPORTS_DIR,
+        filename_prefix="runner",
+        extra_tables=profiler.report_tables(args.profile_alert) if profiler else (),
+    )
+    for result in results:
+        print(f"{result.status:8} {result.name} {result.details}")
+    if profiler:
+        for profile in profiler.profiles:
+            spots = ", ".join(spot.location for spot in profile.hot_spots[:3])
+            print(f"⏱ {profile.label}: harness {profile.overhead:.1%} de {profile.wall:.2f} s ({spots})")
+        for profile in profiler.alerts(args.profile_alert):
+            print(
+                f"⚠️ {profile.label}: el harness consumió {profile.overhead:.1%} de la duración "
+                f"(umbral {args.profile_alert:.0%}); revisar el perfil antes de atribuir la latencia a los servicios"
+            )
+    print(f"📝 Reporte: {report_path}")
+    if stream:
+        stream.emit(
+            "run_end",
+            ok=sum(1 for result in results if result.status == "OK"),
+            failed=sum(1 for result in results if result.status == "FALLO"),
+            skipped=sum(1 for result in results if result.status == "OMITIDO"),
+            report=str(report_path),
+        )
+        stream.close()
+    return 0 if all(result.status == "OK" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
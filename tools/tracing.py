@@ -0,0 +1,335 @@
+"""Propagación de contexto de traza (W3C `traceparent`) y latencia por salto.
+
+El harness inyecta un `traceparent` en cada webhook y registra su propio span
+raíz. Los spans que emiten los servicios se recogen de dos fuentes:
+
+- `SpanCollector`: sustituto local de un colector OTLP/HTTP (`POST /v1/traces`
+  en JSON); los servicios exportan con
+  `OTEL_EXPORTER_OTLP_ENDPOINT=http://127.0.0.1:4318` y
+  `OTEL_EXPORTER_OTLP_PROTOCOL=http/json`.
+- `/__control__/events`: eventos que incluyen un campo `span` con la misma
+  forma que un span OTLP JSON (`traceId`, `spanId`, `parentSpanId`, `name`,
+  `startTimeUnixNano`, `endTimeUnixNano`) y, opcionalmente, `service`.
+
+Como cada servicio usa su propio reloj, `correct_clock_skew` estima un
+desfase por servicio a partir de los intervalos padre/hijo antes de
+descomponer la latencia por salto.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import gzip
+import json
+import re
+import secrets
+import statistics
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable
+
+import httpx
+
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+ROOT_SERVICE = "harness"
+SPAN_KIND_CLIENT = 3
+UNKNOWN_SERVICE = "desconocido"
+
+
+@dataclass(frozen=True)
+class TraceContext:
+    trace_id: str
+    span_id: str
+
+    @classmethod
+    def new(cls) -> "TraceContext":
+        return cls(trace_id=secrets.token_hex(16), span_id=secrets.token_hex(8))
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+def parse_traceparent(value: str) -> TraceContext | None:
+    match = TRACEPARENT_PATTERN.match(value.strip().lower())
+    return TraceContext(match.group(1), match.group(2)) if match else None
+
+
+def trace_headers(context: TraceContext | None = None) -> dict[str, str]:
+    """Cabeceras para propagar la traza; crea un contexto nuevo si no se indica."""
+    return {TRACEPARENT_HEADER: (context or TraceContext.new()).traceparent}
+
+
+@dataclass(frozen=True)
+class Span:
+    """Span normalizado; `start`/`end` en segundos Unix según el reloj de `service`."""
+
+    trace_id: str
+    span_id: str
+    parent_span_id: str
+    name: str
+    service: str
+    start: float
+    end: float
+    kind: int = 0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def traced_post(client: httpx.Client, path: str, name: str, **kwargs: Any) -> tuple[httpx.Response, Span]:
+    """`POST` con `traceparent`; devuelve la respuesta y el span raíz del harness."""
+    context = TraceContext.new()
+    headers = {**kwargs.pop("headers", {}), **trace_headers(context)}
+    start = time.time()
+    response = client.post(path, headers=headers, **kwargs)
+    span = Span(context.trace_id, context.span_id, "", name, ROOT_SERVICE, start, time.time(), SPAN_KIND_CLIENT)
+    return response, span
+
+
+# --- Lectura de spans -------------------------------------------------------
+
+
+def _hex_id(value: str) -> str:
+    """IDs OTLP JSON: hex según la especificación; algunos exportadores usan base64."""
+    if re.fullmatch(r"[0-9a-fA-F]*", value or ""):
+        return (value or "").lower()
+    try:
+        return base64.b64decode(value).hex()
+    except (binascii.Error, ValueError):
+        return value
+
+
+def _attribute(attributes: list[dict[str, Any]], key: str) -> str | None:
+    for attribute in attributes:
+        if attribute.get("key") == key:
+            value = attribute.get("value", {})
+            return value.get("stringValue") if isinstance(value, dict) else str(value)
+    return None
+
+
+def span_from_otlp(raw: dict[str, Any], service: str) -> Span:
+    return Span(
+        trace_id=_hex_id(raw.get("traceId", "")),
+        span_id=_hex_id(raw.get("spanId", "")),
+        parent_span_id=_hex_id(raw.get("parentSpanId", "")),
+        name=raw.get("name", ""),
+        service=service,
+        start=int(raw.get("startTimeUnixNano", 0)) / 1e9,
+        end=int(raw.get("endTimeUnixNano", 0)) / 1e9,
+        kind=int(raw.get("kind", 0)),
+    )
+
+
+def spans_from_otlp(body: dict[str, Any]) -> list[Span]:
+    """Spans de un `ExportTraceServiceRequest` en OTLP JSON."""
+    spans = []
+    for resource_spans in body.get("resourceSpans", []):
+        attributes = resource_spans.get("resource", {}).get("attributes", [])
+        service = _attribute(attributes, "service.name") or UNKNOWN_SERVICE
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            spans.extend(span_from_otlp(raw, service) for raw in scope_spans.get("spans", []))
+    return spans
+
+
+def spans_from_events(events: Iterable[dict[str, Any]], default_service: str = "fake_osm") -> list[Span]:
+    """Spans incluidos en eventos de `/__control__/events` (campo `span`, arriba o en `payload`)."""
+    spans = []
+    for event in events:
+        payload = event.get("payload") if isinstance(event.get("payload"), dict) else {}
+        raw = event.get("span") or payload.get("span")
+        if not isinstance(raw, dict):
+            continue
+        service = raw.get("service") or event.get("service") or payload.get("service") or default_service
+        spans.append(span_from_otlp(raw, service))
+    return spans
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    server: "SpanCollector"
+
+    def do_POST(self) -> None:  # noqa: N802 - nombre impuesto por BaseHTTPRequestHandler
+        if self.path.split("?")[0] != "/v1/traces":
+            return self._reply(404, {"error": "Not Found"})
+        if "json" not in (self.headers.get("Content-Type") or ""):
+            return self._reply(415, {"error": "Solo OTLP/HTTP JSON (OTEL_EXPORTER_OTLP_PROTOCOL=http/json)"})
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.headers.get("Content-Encoding") == "gzip":
+            raw = gzip.decompress(raw)
+        try:
+            spans = spans_from_otlp(json.loads(raw or b"{}"))
+        except (ValueError, TypeError) as exc:
+            return self._reply(400, {"error": str(exc)})
+        self.server.add(spans)
+        self._reply(200, {"partialSuccess": {}})
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?")[0] == "/__control__/spans":
+            return self._reply(200, {"spans": len(self.server.spans)})
+        self._reply(404, {"error": "Not Found"})
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _reply(self, status: int, body: dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class SpanCollector(ThreadingHTTPServer):
+    """Colector OTLP/HTTP mínimo que guarda los spans en memoria."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), _CollectorHandler)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, spans: list[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def snapshot(self) -> list[Span]:
+        with self._lock:
+            return list(self.spans)
+
+    def start(self) -> "SpanCollector":
+        threading.Thread(target=self.serve_forever, name="otlp-collector", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def group_traces(spans: Iterable[Span], trace_ids: Iterable[str] | None = None) -> dict[str, list[Span]]:
+    """Spans agrupados por traza, sin duplicados y limitados a `trace_ids` si se indica."""
+    wanted = set(trace_ids) if trace_ids is not None else None
+    traces: dict[str, dict[str, Span]] = defaultdict(dict)
+    for span in spans:
+        if wanted is None or span.trace_id in wanted:
+            traces[span.trace_id].setdefault(span.span_id, span)
+    return {trace_id: list(by_id.values()) for trace_id, by_id in traces.items()}
+
+
+# --- Desfase de relojes -----------------------------------------------------
+
+
+def correct_clock_skew(
+    traces: dict[str, list[Span]], root_service: str = ROOT_SERVICE
+) -> tuple[dict[str, list[Span]], dict[str, float]]:
+    """Lleva todos los spans al reloj de `root_service`.
+
+    Para cada servicio hijo se acota su desfase con todas las trazas: un hijo
+    no empieza antes que su padre y, si el padre es una llamada síncrona
+    (span CLIENT), tampoco termina después. Se aplica la menor corrección
+    compatible con todas las cotas (0 si los relojes ya son coherentes) y se
+    propaga servicio a servicio desde la raíz. Devuelve los spans corregidos y
+    el desfase sumado a cada servicio, en segundos.
+    """
+    offsets: dict[str, float] = {root_service: 0.0}
+    frontier = [root_service]
+    while frontier:
+        parent_service = frontier.pop(0)
+        lower: dict[str, float] = {}
+        upper: dict[str, float] = {}
+        for spans in traces.values():
+            by_id = {span.span_id: span for span in spans}
+            for span in spans:
+                parent = by_id.get(span.parent_span_id)
+                if parent is None or parent.service != parent_service or span.service in offsets:
+                    continue
+                parent_start = parent.start + offsets[parent_service]
+                parent_end = parent.end + offsets[parent_service]
+                lower[span.service] = max(lower.get(span.service, float("-inf")), parent_start - span.start)
+                if parent.kind == SPAN_KIND_CLIENT and span.duration <= parent.duration:
+                    upper[span.service] = min(upper.get(span.service, float("inf")), parent_end - span.end)
+        for service, low in lower.items():
+            high = upper.get(service, float("inf"))
+            # Cotas incompatibles (deriva del reloj durante la carga): punto medio.
+            offsets[service] = min(max(0.0, low), high) if low <= high else (low + high) / 2
+            frontier.append(service)
+
+    def shifted(span: Span) -> Span:
+        offset = offsets.get(span.service, 0.0)
+        return replace(span, start=span.start + offset, end=span.end + offset)
+
+    corrected = {trace_id: [shifted(span) for span in spans] for trace_id, spans in traces.items()}
+    return corrected, offsets
+
+
+# --- Descomposición por salto -----------------------------------------------
+
+
+@dataclass
+class HopSamples:
+    service: str
+    arrival: list[float]
+    duration: list[float]
+    self_time: list[float]
+
+    @property
+    def median_arrival(self) -> float:
+        return statistics.median(self.arrival) if self.arrival else 0.0
+
+
+def _union_length(intervals: list[tuple[float, float]]) -> float:
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def hop_breakdown(traces: dict[str, list[Span]], root_service: str = ROOT_SERVICE) -> list[HopSamples]:
+    """Muestras por servicio (salto), ordenadas por el instante típico en que empieza.
+
+    Por traza y servicio:
+    - llegada: desde el inicio del span raíz hasta el primer span del servicio;
+    - duración: del primer inicio al último fin de sus spans;
+    - tiempo propio: duración sin los spans de otros servicios que cuelgan de él.
+    """
+    hops: dict[str, HopSamples] = {}
+    for spans in traces.values():
+        roots = [span for span in spans if span.service == root_service]
+        if not roots:
+            continue
+        trace_start = min(span.start for span in roots)
+        by_service: dict[str, list[Span]] = defaultdict(list)
+        for span in spans:
+            by_service[span.service].append(span)
+        for service, own in by_service.items():
+            if service == root_service:
+                continue
+            own_ids = {span.span_id for span in own}
+            children = [span for span in spans if span.parent_span_id in own_ids and span.service != service]
+            busy = _union_length([(span.start, span.end) for span in own])
+            waiting = _union_length([(span.start, span.end) for span in children])
+            hop = hops.setdefault(service, HopSamples(service, [], [], []))
+            hop.arrival.append(min(span.start for span in own) - trace_start)
+            hop.duration.append(max(span.end for span in own) - min(span.start for span in own))
+            hop.self_time.append(max(busy - waiting, 0.0))
+    return sorted(hops.values(), key=lambda hop: hop.median_arrival)